@@ -1,51 +1,77 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from ..core.database import get_db
-from ..core.security import verify_token
-from ..services.auth import AuthService
-from ..models.user import User
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPBearer
 
 security = HTTPBearer()
 
 
-def get_current_user(
-    db: Session = Depends(get_db)
-) -> User:
+@dataclass(frozen=True, slots=True)
+class DummyUser:
+    """Lightweight stand-in for the User model while authentication is disabled"""
+    id: int
+    email: str
+    username: str
+    full_name: str
+    is_active: bool
+    is_superuser: bool
+    bio: Optional[str] = None
+    profile_picture: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None
+
+
+# Stub users returned while authentication is disabled; plain dataclasses
+# built once at import so no ORM instrumentation runs per request.
+_DUMMY_USER = DummyUser(
+    id=1,
+    email="test@example.com",
+    username="testuser",
+    full_name="Test User",
+    is_active=True,
+    is_superuser=False
+)
+
+_DUMMY_SUPERUSER = DummyUser(
+    id=1,
+    email="admin@example.com",
+    username="admin",
+    full_name="Admin User",
+    is_active=True,
+    is_superuser=True
+)
+
+
+def get_current_user() -> DummyUser:
     """Get current authenticated user - TEMPORARILY DISABLED"""
-    # Create a dummy user for testing without authentication
-    dummy_user = User(
-        id=1,
-        email="test@example.com",
-        full_name="Test User",
-        is_active=True,
-        is_superuser=False
-    )
-    return dummy_user
-
-
-def get_current_active_user(db: Session = Depends(get_db)) -> User:
+    return _DUMMY_USER
+
+
+def get_current_active_user() -> DummyUser:
     """Get current active user - TEMPORARILY DISABLED"""
-    # Create a dummy user for testing without authentication
-    dummy_user = User(
-        id=1,
-        email="test@example.com",
-        full_name="Test User",
-        is_active=True,
-        is_superuser=False
-    )
-    return dummy_user
-
-
-def get_current_superuser(db: Session = Depends(get_db)) -> User:
+    return _DUMMY_USER
+
+
+def get_current_superuser() -> DummyUser:
     """Get current superuser - TEMPORARILY DISABLED"""
-    # Create a dummy superuser for testing without authentication
-    dummy_user = User(
-        id=1,
-        email="admin@example.com",
-        full_name="Admin User",
-        is_active=True,
-        is_superuser=True
-    )
-    return dummy_user
+    return _DUMMY_SUPERUSER
+
+
+@lru_cache(maxsize=1)
+def get_music_generator():
+    """Shared MusicGenerator, built on first use"""
+    # Imported here so routers that never generate music don't load the
+    # synthesis stack
+    from ..services.music_generation.music_generator import MusicGenerator
+    return MusicGenerator()
+
+
+async def get_music_generator_async():
+    """Shared MusicGenerator for Depends, resolved on the event loop"""
+    # A sync dependency would be run in the threadpool on every request; only
+    # the first, model-loading call needs to leave the loop
+    if get_music_generator.cache_info().currsize:
+        return get_music_generator()
+    return await run_in_threadpool(get_music_generator)
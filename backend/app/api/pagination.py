@@ -0,0 +1,20 @@
+import base64
+import binascii
+from fastapi import HTTPException, status
+
+# Song lists are paged newest first by keyset on id. The cursor is the id
+# of the last song on the previous page, kept opaque to clients.
+
+
+def encode_cursor(song_id: int) -> str:
+    return base64.urlsafe_b64encode(str(song_id).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
@@ -1,11 +1,14 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
+from fastapi.responses import ORJSONResponse
 from .auth import router as auth_router
 from .users import router as users_router
 # from .songs import router as songs_router  # Temporarily disabled due to ML dependency issues
 from .songs_simple import router as songs_simple_router
 from .upload import router as upload_router
 
-api_router = APIRouter()
+__all__ = ["api_router"]
+
+api_router = APIRouter(default_response_class=ORJSONResponse)
 
 api_router.include_router(auth_router, prefix="/auth", tags=["authentication"])
 api_router.include_router(users_router, prefix="/users", tags=["users"])
@@ -13,8 +16,22 @@ api_router.include_router(users_router, prefix="/users", tags=["users"])
 api_router.include_router(songs_simple_router, prefix="/songs", tags=["songs"])
 api_router.include_router(upload_router, prefix="/upload", tags=["upload"])
 
+# Pre-serialized so liveness probes skip response encoding entirely
+_HEALTH_BODY = b'{"status":"healthy","service":"GenXcover API"}'
+
+
 # Health check endpoint
-@api_router.get("/health")
+@api_router.get("/health", include_in_schema=False)
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "GenXcover API"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
+
+
+# Fail fast if a router gets included twice and would duplicate route matching
+_route_keys = [
+    (route.path, method)
+    for route in api_router.routes
+    for method in getattr(route, "methods", None) or ()
+]
+if len(set(_route_keys)) != len(_route_keys):
+    raise RuntimeError("Duplicate routes registered on api_router")
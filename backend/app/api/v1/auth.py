@@ -1,23 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from ...core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from ...core.database import get_async_db
 from ...schemas.user import UserCreate, User, UserLogin, Token
 from ...services.auth import AuthService
 
 router = APIRouter()
 
+oauth2_form_dep = Depends(OAuth2PasswordRequestForm)
+
+# Fixed JSON shape of Token; JWTs are base64url segments joined by dots, so
+# the token can be spliced in without any escaping.
+_TOKEN_PREFIX = b'{"access_token":"'
+_TOKEN_SUFFIX = b'","token_type":"bearer"}'
+
+
+def _token_response(access_token: str) -> Response:
+    """Build the Token JSON body without a serialization pass"""
+    return Response(
+        content=_TOKEN_PREFIX + access_token.encode() + _TOKEN_SUFFIX,
+        media_type="application/json"
+    )
+
 
 @router.post("/register", response_model=User)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
-    return AuthService.create_user(db=db, user=user)
+    return await AuthService.create_user(db=db, user=user)
 
 
-@router.post("/login", response_model=Token)
-def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+@router.post("/login", responses={200: {"model": Token}})
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login user and return access token"""
-    user = AuthService.authenticate_user(
+    user = await AuthService.authenticate_user(
         db, user_credentials.email, user_credentials.password
     )
     if not user:
@@ -26,24 +41,24 @@ def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    access_token = AuthService.create_access_token_for_user(user)
-    return {"access_token": access_token, "token_type": "bearer"}
+
+    access_token = await AuthService.create_access_token_for_user(user.id, user.email)
+    return _token_response(access_token)
 
 
-@router.post("/token", response_model=Token)
-def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+@router.post("/token", responses={200: {"model": Token}})
+async def login_for_access_token(
+    form_data: OAuth2PasswordRequestForm = oauth2_form_dep,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """OAuth2 compatible token login"""
-    user = AuthService.authenticate_user(db, form_data.username, form_data.password)
+    user = await AuthService.authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    access_token = AuthService.create_access_token_for_user(user)
-    return {"access_token": access_token, "token_type": "bearer"}
+
+    access_token = await AuthService.create_access_token_for_user(user.id, user.email)
+    return _token_response(access_token)
@@ -1,260 +1,197 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
-from ...core.database import get_db
-from ...schemas.song import Song, SongCreate, SongUpdate, SongGenerate, SongList
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from cachetools import TTLCache
+from sqlalchemy import delete, func, insert, lambda_stmt, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Any, Tuple
+from ...core.cache import (
+    get_cached, set_cached, invalidate_songs, song_key, song_list_key
+)
+from ...core.celery_app import celery_app
+from ...core.database import get_async_db, insert_or_ignore
+from ...schemas.song import (
+    Song, SongCreate, SongUpdate, SongGenerate, SongSummary, SongList,
+    LyricsGenerate, SongFromLyricsGenerate, InstrumentalGenerate, SongRemix,
+    SongBulkDelete, SongBulkVisibility, SONG_LIST_ADAPTER
+)
+from ...models.generation_job import GenerationJob
 from ...models.song import Song as SongModel
 from ...models.user import User as UserModel
-from ...api.deps import get_current_active_user
+from ...api.deps import get_current_active_user, get_music_generator_async
+from ...api.pagination import decode_cursor, encode_cursor
+from ...services.azure_openai_client import get_azure_openai_client
 from ...services.music_generation.music_generator import MusicGenerator
+from ...services.song_loader import song_loader
+from ...tasks import (
+    generate_song_task, generate_song_from_lyrics_task,
+    generate_instrumental_task, remix_song_task, params_hash
+)
+import hashlib
 import logging
+from functools import lru_cache
+import uuid
+import orjson
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 @router.post("/", response_model=Song)
-def create_song(
+async def create_song(
     song: SongCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Create a new song"""
-    db_song = SongModel(
-        **song.dict(),
-        creator_id=current_user.id
+    # INSERT ... RETURNING hands back the stored row in the same round-trip.
+    # exclude_unset keeps unset GenerationParams keys out of the stored JSON.
+    db_song = await db.scalar(
+        insert(SongModel)
+        .values(**song.model_dump(exclude_unset=True), creator_id=current_user.id)
+        .returning(SongModel)
     )
-    db.add(db_song)
-    db.commit()
-    db.refresh(db_song)
+    await db.commit()
+    await invalidate_songs()
     return db_song
 
 
-@router.post("/generate", response_model=Song)
-async def generate_song(
-    song_request: SongGenerate,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_active_user)
-):
-    """Generate a complete song with AI"""
-    db_song = None
+async def _record_job(db: AsyncSession, creator_id: int, job_params: Dict[str, Any]) -> str:
+    """Store a generation request's parameters once per distinct request and
+    user, and return the hash songs refer to it by"""
+    # Results are only ever reused for the user who generated them, and the
+    # reuse flag itself doesn't make requests distinct
+    job_params = {
+        **{k: v for k, v in job_params.items() if k != "reuse"},
+        "creator_id": creator_id
+    }
+    job_hash = params_hash(job_params)
+    await db.execute(
+        insert_or_ignore(GenerationJob)
+        .values(params_hash=job_hash, params=job_params)
+        .on_conflict_do_nothing(index_elements=[GenerationJob.params_hash])
+    )
+    return job_hash
+
+
+def _queued_params(job_hash: str, task_id: str) -> Dict[str, Any]:
+    """Initial generation_params of a queued song; the request itself lives
+    in generation_jobs"""
+    return {
+        "params_hash": job_hash,
+        "generation_status": "pending",
+        "generation_step": "queued",
+        "task_id": task_id
+    }
+
+
+async def _enqueue_generation(
+    db: AsyncSession,
+    task,
+    song_id: int,
+    task_id: str,
+    payload: Dict[str, Any],
+    params: Dict[str, Any]
+) -> None:
+    """Dispatch a generation task, marking the song failed if it can't be queued"""
     try:
-        # Create initial song record with pending status
-        db_song = SongModel(
-            title=song_request.title,
-            genre=song_request.genre,
-            style=song_request.style,
-            theme=song_request.theme,
-            voice_type=getattr(song_request, 'voice_type', 'Male'),
-            creator_id=current_user.id,
-            generation_params={
-                **song_request.dict(),
-                "generation_status": "pending",
-                "generation_step": "initializing"
-            }
-        )
-        db.add(db_song)
-        db.commit()
-        db.refresh(db_song)
-        
-        # Update status to lyrics generation
-        db_song.generation_params["generation_step"] = "generating_lyrics"
-        db.commit()
-        
-        # Initialize MusicGenerator and check availability
-        music_generator = MusicGenerator()
-        
-        # Check if MusicGen is available and update status
-        if hasattr(music_generator, 'using_musicgen') and music_generator.using_musicgen:
-            db_song.generation_params["audio_engine"] = "musicgen"
-            db_song.generation_params["audio_quality"] = "high"
-        else:
-            db_song.generation_params["audio_engine"] = "basic_synthesizer"
-            db_song.generation_params["audio_quality"] = "basic"
-            logger.warning("MusicGen not available, using basic synthesizer")
-        
-        db.commit()
-        
-        # Generate complete song using MusicGenerator
-        generation_result = await music_generator.generate_complete_song(
-            title=song_request.title,
-            genre=song_request.genre,
-            theme=song_request.theme,
-            style=song_request.style,
-            voice_type=getattr(song_request, 'voice_type', 'Male'),
-            include_audio=getattr(song_request, 'include_audio', True),
-            include_midi=getattr(song_request, 'include_midi', True),
-            custom_prompt=getattr(song_request, 'custom_prompt', None)
-        )
-        
-        # Update status to finalizing
-        db_song.generation_params["generation_step"] = "finalizing"
-        db.commit()
-        
-        # Update song with generated content
-        db_song.lyrics = generation_result.get("lyrics", "")
-        db_song.is_generated = True
-        
-        # Store file paths and convert to URLs
-        if generation_result.get("audio_file_path"):
-            # Convert local path to URL
-            audio_path = generation_result["audio_file_path"]
-            db_song.audio_file_path = f"http://localhost:8005/{audio_path}"
-        if generation_result.get("midi_file_path"):
-            # Convert local path to URL
-            midi_path = generation_result["midi_file_path"]
-            db_song.midi_file_path = f"http://localhost:8005/{midi_path}"
-        
-        # Store metadata
-        if generation_result.get("duration"):
-            db_song.duration = generation_result["duration"]
-        if generation_result.get("tempo"):
-            db_song.tempo = generation_result["tempo"]
-        if generation_result.get("key"):
-            db_song.key_signature = generation_result["key"]
-        
-        # Store audio features and analysis
-        if generation_result.get("analysis"):
-            db_song.audio_features = generation_result["analysis"]
-        
-        # Update generation parameters with success status
-        db_song.generation_params = {
-            **db_song.generation_params,
-            "generation_status": "completed",
-            "generation_step": "completed",
-            "generation_successful": True,
-            "generation_timestamp": generation_result.get("generation_timestamp"),
-            "files_generated": {
-                "audio": generation_result.get("audio_file_path") is not None,
-                "midi": generation_result.get("midi_file_path") is not None
-            }
-        }
-        
-        db.commit()
-        db.refresh(db_song)
-        return db_song
-        
+        # Publishing to the broker is blocking I/O
+        await run_in_threadpool(task.apply_async, args=(song_id, payload), task_id=task_id)
     except Exception as e:
-        error_message = str(e)
-        logger.error(f"Error generating song: {error_message}")
-        
-        # Determine user-friendly error message
-        user_friendly_error = _get_user_friendly_error(error_message)
-        
-        # Update song with error status
-        if db_song:
-            db_song.generation_params = {
-                **db_song.generation_params,
-                "generation_status": "failed",
-                "generation_step": "error",
-                "generation_successful": False,
-                "error": error_message,
-                "user_friendly_error": user_friendly_error
-            }
-            db.commit()
-        
+        logger.error(f"Error queueing song generation: {str(e)}")
+        params.update({
+            "generation_status": "failed",
+            "generation_step": "error",
+            "generation_successful": False,
+            "error": str(e)
+        })
+        await db.execute(
+            update(SongModel)
+            .where(SongModel.id == song_id)
+            .values(generation_params=params)
+        )
+        await db.commit()
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail={
-                "message": user_friendly_error,
-                "technical_error": error_message,
-                "error_type": _classify_error(error_message),
-                "suggestions": _get_error_suggestions(error_message)
-            }
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Song generation is temporarily unavailable. Please try again later."
         )
 
 
-def _get_user_friendly_error(error_message: str) -> str:
-    """Convert technical error to user-friendly message"""
-    error_lower = error_message.lower()
-    
-    if "musicgen" in error_lower and "not available" in error_lower:
-        return "High-quality audio generation is currently unavailable. Using basic audio synthesis instead."
-    elif "cuda" in error_lower or "gpu" in error_lower or "memory" in error_lower:
-        return "Audio generation failed due to insufficient system resources. Please try again with shorter duration or contact support."
-    elif "timeout" in error_lower:
-        return "Audio generation is taking longer than expected. Please try again or reduce the song duration."
-    elif "azure" in error_lower or "openai" in error_lower:
-        return "Lyrics generation service is temporarily unavailable. Please try again later."
-    elif "connection" in error_lower or "network" in error_lower:
-        return "Network connection issue. Please check your internet connection and try again."
-    elif "permission" in error_lower or "access" in error_lower:
-        return "Access denied. Please check your account permissions."
-    else:
-        return "An unexpected error occurred during song generation. Please try again or contact support if the problem persists."
+def _generation_accepted(http_request: Request, song_id: int, task_id: str) -> Dict[str, Any]:
+    """202 body pointing the client at the status endpoint"""
+    return {
+        "song_id": song_id,
+        "task_id": task_id,
+        "status": "queued",
+        "status_url": str(http_request.url_for("get_generation_status", song_id=song_id))
+    }
 
 
-def _classify_error(error_message: str) -> str:
-    """Classify error type for better handling"""
-    error_lower = error_message.lower()
-    
-    if "musicgen" in error_lower or "audiocraft" in error_lower:
-        return "audio_generation_error"
-    elif "cuda" in error_lower or "gpu" in error_lower:
-        return "resource_error"
-    elif "azure" in error_lower or "openai" in error_lower:
-        return "ai_service_error"
-    elif "connection" in error_lower or "network" in error_lower:
-        return "network_error"
-    elif "timeout" in error_lower:
-        return "timeout_error"
-    else:
-        return "unknown_error"
+async def _enqueue_task(task, *args) -> str:
+    """Dispatch a task whose result is read back via /tasks/{task_id}"""
+    try:
+        return (await run_in_threadpool(task.apply_async, args=args)).id
+    except Exception as e:
+        logger.error(f"Error queueing task: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Generation is temporarily unavailable. Please try again later."
+        )
 
 
-def _get_error_suggestions(error_message: str) -> list:
-    """Get suggestions based on error type"""
-    error_type = _classify_error(error_message)
-    
-    suggestions = {
-        "audio_generation_error": [
-            "Try using basic audio synthesis instead",
-            "Check if MusicGen dependencies are installed",
-            "Reduce song duration to under 30 seconds"
-        ],
-        "resource_error": [
-            "Try generating shorter songs (under 15 seconds)",
-            "Close other applications to free up memory",
-            "Contact support for system requirements"
-        ],
-        "ai_service_error": [
-            "Check your internet connection",
-            "Verify API credentials are configured",
-            "Try again in a few minutes"
-        ],
-        "network_error": [
-            "Check your internet connection",
-            "Try again in a few moments",
-            "Contact support if problem persists"
-        ],
-        "timeout_error": [
-            "Try generating shorter songs",
-            "Reduce complexity by using simpler genres",
-            "Try again during off-peak hours"
-        ],
-        "unknown_error": [
-            "Try again in a few minutes",
-            "Check your input parameters",
-            "Contact support with error details"
-        ]
+def _task_accepted(http_request: Request, task_id: str) -> Dict[str, Any]:
+    """202 body pointing the client at the task status endpoint"""
+    return {
+        "task_id": task_id,
+        "status": "queued",
+        "status_url": str(http_request.url_for("get_task_status", task_id=task_id))
     }
+
+
+@router.post("/generate", status_code=status.HTTP_202_ACCEPTED)
+async def generate_song(
+    song_request: SongGenerate,
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Queue a complete song generation with AI"""
+    # The song record is stored up front; a worker fills it in and the
+    # client polls /{song_id}/status
+    task_id = str(uuid.uuid4())
+    payload = song_request.model_dump(mode="json")
+    params = _queued_params(
+        await _record_job(db, current_user.id, {"generation_type": "complete", **payload}), task_id
+    )
+    song_id = await db.scalar(
+        insert(SongModel)
+        .values(
+            **{k: payload[k] for k in ("title", "genre", "style", "theme", "voice_type")},
+            creator_id=current_user.id,
+            generation_params=params
+        )
+        .returning(SongModel.id)
+    )
+    await db.commit()
+    await invalidate_songs()
     
-    return suggestions.get(error_type, ["Try again later", "Contact support if problem persists"])
+    await _enqueue_generation(db, generate_song_task, song_id, task_id, payload, params)
+    return _generation_accepted(http_request, song_id, task_id)
 
 
 @router.post("/generate-lyrics")
 async def generate_lyrics_only(
-    request: Dict[str, Any]
+    request: LyricsGenerate,
+    music_generator: MusicGenerator = Depends(get_music_generator_async)
 ):
     """Generate only lyrics for a song"""
     try:
-        music_generator = MusicGenerator()
         result = await music_generator.generate_lyrics_only(
-            title=request.get("title", "Untitled"),
-            genre=request.get("genre", "Pop"),
-            theme=request.get("theme"),
-            style=request.get("style"),
-            custom_prompt=request.get("custom_prompt")
+            title=request.title,
+            genre=request.genre,
+            theme=request.theme,
+            style=request.style,
+            custom_prompt=request.custom_prompt
         )
         return result
     except Exception as e:
@@ -265,444 +202,521 @@ async def generate_lyrics_only(
         )
 
 
-@router.post("/generate-from-lyrics", response_model=Song)
+def _sse(data: Dict[str, Any], event: Optional[str] = None) -> bytes:
+    """One Server-Sent Events message with a JSON payload"""
+    prefix = f"event: {event}\n".encode() if event else b""
+    return prefix + b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+@router.post("/generate-lyrics/stream")
+async def stream_lyrics(
+    request: LyricsGenerate,
+    music_generator: MusicGenerator = Depends(get_music_generator_async)
+):
+    """Generate lyrics as Server-Sent Events: `data` messages carry {"text": chunk}
+    as the model produces it, followed by a `done` (or `error`) event"""
+    azure_openai_client = get_azure_openai_client()
+    
+    async def events():
+        try:
+            if azure_openai_client.is_available():
+                async for text in azure_openai_client.generate_lyrics_stream(
+                    title=request.title,
+                    genre=request.genre,
+                    theme=request.theme,
+                    style=request.style,
+                    custom_prompt=request.custom_prompt
+                ):
+                    yield _sse({"text": text})
+            else:
+                # Template lyrics are produced all at once
+                result = await music_generator.generate_lyrics_only(
+                    title=request.title,
+                    genre=request.genre,
+                    theme=request.theme,
+                    style=request.style,
+                    custom_prompt=request.custom_prompt
+                )
+                yield _sse({"text": result["lyrics"]})
+        except Exception as e:
+            logger.error(f"Error streaming lyrics: {str(e)}")
+            yield _sse({"detail": f"Failed to generate lyrics: {str(e)}"}, event="error")
+            return
+        yield _sse({}, event="done")
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/generate-from-lyrics", status_code=status.HTTP_202_ACCEPTED)
 async def generate_song_from_lyrics(
-    request: Dict[str, Any],
-    db: Session = Depends(get_db),
+    request: SongFromLyricsGenerate,
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
-    """Generate a complete song from existing lyrics"""
-    try:
-        # Validate required fields
-        if not request.get("lyrics"):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Lyrics are required"
-            )
-        if not request.get("title"):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Title is required"
-            )
-        
-        # Create initial song record
-        db_song = SongModel(
-            title=request.get("title"),
-            genre=request.get("genre", "Pop"),
-            style=request.get("style"),
-            voice_type=request.get("voice_type", "Male"),
-            lyrics=request.get("lyrics"),
+    """Queue a complete song generation from existing lyrics"""
+    # Create initial song record
+    task_id = str(uuid.uuid4())
+    payload = request.model_dump(mode="json")
+    params = _queued_params(
+        await _record_job(db, current_user.id, {"generation_type": "from_lyrics", **payload}), task_id
+    )
+    song_id = await db.scalar(
+        insert(SongModel)
+        .values(
+            **{k: payload[k] for k in ("title", "genre", "style", "voice_type", "lyrics")},
             creator_id=current_user.id,
-            generation_params={
-                **request,
-                "generation_type": "from_lyrics"
-            }
-        )
-        db.add(db_song)
-        db.commit()
-        db.refresh(db_song)
-        
-        # Generate complete song using MusicGenerator
-        music_generator = MusicGenerator()
-        generation_result = await music_generator.generate_song_from_lyrics(
-            lyrics=request.get("lyrics"),
-            title=request.get("title"),
-            genre=request.get("genre", "Pop"),
-            voice_type=request.get("voice_type", "Male"),
-            key=request.get("key", "C"),
-            tempo=request.get("tempo", 120),
-            duration=request.get("duration"),
-            include_audio=request.get("include_audio", True),
-            include_midi=request.get("include_midi", True),
-            style=request.get("style")
+            generation_params=params
         )
-        
-        # Update song with generated content
-        db_song.is_generated = True
-        
-        # Store file paths
-        if generation_result.get("audio_file_path"):
-            db_song.audio_file_path = generation_result["audio_file_path"]
-        if generation_result.get("midi_file_path"):
-            db_song.midi_file_path = generation_result["midi_file_path"]
-        
-        # Store metadata
-        if generation_result.get("duration"):
-            db_song.duration = generation_result["duration"]
-        if generation_result.get("tempo"):
-            db_song.tempo = generation_result["tempo"]
-        if generation_result.get("key"):
-            db_song.key_signature = generation_result["key"]
-        
-        # Store audio features and analysis
-        if generation_result.get("analysis"):
-            db_song.audio_features = generation_result["analysis"]
-        
-        # Update generation parameters with results
-        db_song.generation_params = {
-            **db_song.generation_params,
-            "generation_successful": True,
-            "generation_timestamp": generation_result.get("generation_timestamp"),
-            "files_generated": {
-                "audio": generation_result.get("audio_file_path") is not None,
-                "midi": generation_result.get("midi_file_path") is not None
-            }
-        }
-        
-        db.commit()
-        db.refresh(db_song)
-        return db_song
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error generating song from lyrics: {str(e)}")
-        # Update song with error status
-        if 'db_song' in locals():
-            db_song.generation_params = {
-                **db_song.generation_params,
-                "generation_successful": False,
-                "error": str(e)
-            }
-            db.commit()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate song from lyrics: {str(e)}"
+        .returning(SongModel.id)
+    )
+    await db.commit()
+    await invalidate_songs()
+    
+    await _enqueue_generation(db, generate_song_from_lyrics_task, song_id, task_id, payload, params)
+    return _generation_accepted(http_request, song_id, task_id)
+
+
+def _readable_by(user_id: int):
+    """SQL predicate for songs a user may read: public ones and their own"""
+    return or_(SongModel.is_public.is_(True), SongModel.creator_id == user_id)
+
+
+def _song_access_error(existing_id: Optional[int]) -> HTTPException:
+    """Error for a song the access predicate filtered out: 404 if the id
+    doesn't exist at all, 403 otherwise"""
+    if existing_id is None:
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Song not found"
         )
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Not enough permissions"
+    )
+
+
+# Lists are paged newest first by keyset on id rather than OFFSET, so deep
+# pages cost the same as the first. Ids are assigned in insertion order, so
+# this matches created_at order; unlike the timestamp, an integer key also
+# compares exactly on SQLite, whose CURRENT_TIMESTAMP has no fractional part.
+#
+# List queries are built as lambda statements: SQLAlchemy caches the compiled
+# SQL per combination of criteria and only binds the values per request.
+
+def _keyset_page(stmt, cursor: Optional[str], limit: int):
+    """Apply the cursor to a song query and fetch one extra row to detect a next page"""
+    if cursor:
+        before_id = decode_cursor(cursor)
+        stmt += lambda s: s.where(SongModel.id < before_id)
+    page_size = limit + 1
+    return stmt + (lambda s: s.order_by(SongModel.id.desc()).limit(page_size))
+
+
+# The public list loads only the columns SongSummary serializes
+_SUMMARY_SELECT = select(*(getattr(SongModel, field) for field in SongSummary.model_fields))
 
 
 @router.get("/", response_model=SongList)
-def read_songs(
-    skip: int = 0,
-    limit: int = 20,
+async def read_songs(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
     genre: Optional[str] = None,
     creator_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get list of public songs"""
-    query = db.query(SongModel).filter(SongModel.is_public == True)
+    cache_key = song_list_key(genre, creator_id, cursor, limit)
+    cached = await get_cached(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
     
+    # Deliberately `== True`, not `.is_(True)`: the partial indexes are keyed
+    # on this exact predicate, and SQLite won't match `is_public IS 1` to them
+    stmt = lambda_stmt(lambda: _SUMMARY_SELECT.where(SongModel.is_public == True))
     if genre:
-        query = query.filter(SongModel.genre == genre)
+        stmt += lambda s: s.where(SongModel.genre == genre)
     if creator_id:
-        query = query.filter(SongModel.creator_id == creator_id)
+        stmt += lambda s: s.where(SongModel.creator_id == creator_id)
+    if not cursor:
+        # COUNT(*) OVER() returns the filtered total alongside the first page
+        stmt += lambda s: s.add_columns(func.count().over().label("total"))
     
-    total = query.count()
-    songs = query.offset(skip).limit(limit).all()
+    rows = (await db.execute(_keyset_page(stmt, cursor, limit))).all()
+    songs = rows[:limit]
+    total = None
+    if not cursor:
+        total = rows[0].total if rows else 0
     
-    return SongList(
+    content = orjson.dumps(SongList(
         songs=songs,
         total=total,
-        page=skip // limit + 1,
-        per_page=limit
-    )
+        per_page=limit,
+        next_cursor=encode_cursor(songs[-1].id) if len(rows) > limit else None
+    ).model_dump())
+    await set_cached(cache_key, content, is_list=True)
+    return Response(content=content, media_type="application/json")
 
 
 @router.get("/my-songs", response_model=List[Song])
-def read_my_songs(
-    skip: int = 0,
-    limit: int = 20,
-    db: Session = Depends(get_db),
+async def read_my_songs(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
-    """Get current user's songs"""
-    songs = db.query(SongModel).filter(
-        SongModel.creator_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    return songs
+    """Get current user's songs; the next page's cursor is sent in X-Next-Cursor"""
+    user_id = current_user.id
+    songs = (await db.scalars(_keyset_page(
+        lambda_stmt(lambda: select(SongModel).where(SongModel.creator_id == user_id)),
+        cursor, limit
+    ))).all()
+    headers = {}
+    if len(songs) > limit:
+        songs = songs[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(songs[-1].id)
+    content = SONG_LIST_ADAPTER.dump_json(
+        SONG_LIST_ADAPTER.validate_python(songs, from_attributes=True)
+    )
+    return Response(content=content, media_type="application/json", headers=headers)
 
 
 @router.get("/{song_id}", response_model=Song)
-def read_song(
+async def read_song(
     song_id: int, 
-    db: Session = Depends(get_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Get song by ID"""
-    song = db.query(SongModel).filter(SongModel.id == song_id).first()
-    if not song:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Song not found"
-        )
+    # Only public songs are cached, so a hit is readable by anyone
+    cached = await get_cached(song_key(song_id))
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
+    # Batched with concurrent lookups into one IN query
+    song = await song_loader.load(song_id)
+    if song is None:
+        raise _song_access_error(None)
     
     # Check if song is public or user owns it
     if not song.is_public and song.creator_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+        raise _song_access_error(song_id)
     
-    return song
+    if not song.is_public:
+        return song
+    content = orjson.dumps(Song.model_validate(song).model_dump())
+    await set_cached(song_key(song_id), content)
+    return Response(content=content, media_type="application/json")
 
 
 @router.put("/{song_id}", response_model=Song)
-def update_song(
+async def update_song(
     song_id: int,
     song_update: SongUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Update song"""
-    song = db.query(SongModel).filter(SongModel.id == song_id).first()
-    if not song:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Song not found"
+    # Update in place, only if the user owns the song
+    owned = (SongModel.id == song_id, SongModel.creator_id == current_user.id)
+    update_data = song_update.model_dump(exclude_unset=True)
+    if update_data:
+        song = await db.scalar(
+            update(SongModel).where(*owned).values(**update_data).returning(SongModel)
         )
-    
-    # Check if user owns the song
-    if song.creator_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
+    else:
+        song = await db.scalar(select(SongModel).where(*owned))
+    if song is None:
+        raise _song_access_error(
+            await db.scalar(select(SongModel.id).where(SongModel.id == song_id))
         )
     
-    # Update song
-    update_data = song_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(song, field, value)
-    
-    db.commit()
-    db.refresh(song)
+    await db.commit()
+    if update_data:
+        await invalidate_songs(song_id)
     return song
 
 
-@router.delete("/{song_id}")
-def delete_song(
+@router.delete("/{song_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_song(
     song_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Delete song"""
-    song = db.query(SongModel).filter(SongModel.id == song_id).first()
-    if not song:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Song not found"
+    # Delete only if the user owns the song
+    deleted_id = await db.scalar(
+        delete(SongModel)
+        .where(SongModel.id == song_id, SongModel.creator_id == current_user.id)
+        .returning(SongModel.id)
+    )
+    if deleted_id is None:
+        raise _song_access_error(
+            await db.scalar(select(SongModel.id).where(SongModel.id == song_id))
         )
     
-    # Check if user owns the song
-    if song.creator_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+    await db.commit()
+    await invalidate_songs(song_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+# Bulk mutations run as one statement per batch; ids the user doesn't own
+# (or that don't exist) are skipped and left out of the returned ids.
+
+@router.delete("/")
+async def delete_songs(
+    request: SongBulkDelete,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Delete several of the user's songs"""
+    deleted_ids = (await db.scalars(
+        delete(SongModel)
+        .where(SongModel.id.in_(request.ids), SongModel.creator_id == current_user.id)
+        .returning(SongModel.id)
+    )).all()
+    await db.commit()
     
-    db.delete(song)
-    db.commit()
-    return {"message": "Song deleted successfully"}
+    if deleted_ids:
+        await invalidate_songs(*deleted_ids)
+    return {"deleted_ids": deleted_ids}
 
 
-@router.post("/generate-instrumental")
+@router.patch("/")
+async def set_songs_visibility(
+    request: SongBulkVisibility,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """Publish or unpublish several of the user's songs"""
+    updated_ids = (await db.scalars(
+        update(SongModel)
+        .where(SongModel.id.in_(request.ids), SongModel.creator_id == current_user.id)
+        .values(is_public=request.is_public)
+        .returning(SongModel.id)
+    )).all()
+    await db.commit()
+    
+    if updated_ids:
+        await invalidate_songs(*updated_ids)
+    return {"updated_ids": updated_ids}
+
+
+@router.post("/generate-instrumental", status_code=status.HTTP_202_ACCEPTED)
 async def generate_instrumental(
-    request: Dict[str, Any]
+    request: InstrumentalGenerate,
+    http_request: Request
 ):
-    """Generate instrumental music"""
-    try:
-        music_generator = MusicGenerator()
-        result = await music_generator.generate_instrumental(
-            title=request.get("title", "Untitled"),
-            genre=request.get("genre", "Pop"),
-            key=request.get("key", "C"),
-            tempo=request.get("tempo", 120),
-            duration=request.get("duration", 180),
-            style=request.get("style"),
-            include_audio=request.get("include_audio", True)
-        )
-        return result
-    except Exception as e:
-        logger.error(f"Error generating instrumental: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate instrumental: {str(e)}"
-        )
+    """Queue an instrumental generation"""
+    task_id = await _enqueue_task(generate_instrumental_task, request.model_dump())
+    return _task_accepted(http_request, task_id)
 
 
-@router.post("/{song_id}/remix")
+@router.post("/{song_id}/remix", status_code=status.HTTP_202_ACCEPTED)
 async def remix_song(
     song_id: int,
-    request: Dict[str, Any],
-    db: Session = Depends(get_db),
+    request: SongRemix,
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
-    """Remix an existing song"""
+    """Queue a remix of an existing song"""
+    # Primary-key lookup, served from the identity map when already loaded
+    song = await db.get(SongModel, song_id)
+    if song is None:
+        raise _song_access_error(None)
+    
+    # The original song must be public or owned by the user
+    if not song.is_public and song.creator_id != current_user.id:
+        raise _song_access_error(song_id)
+    
+    task_id = await _enqueue_task(remix_song_task, song_id, request.model_dump())
+    return _task_accepted(http_request, task_id)
+
+
+@router.get("/tasks/{task_id}")
+async def get_task_status(task_id: str):
+    """Get state, and once finished the result, of a queued instrumental or remix"""
+    def read_task():
+        result = celery_app.AsyncResult(task_id)
+        state = result.state
+        if state == "SUCCESS":
+            return {"task_id": task_id, "state": state, "result": result.result}
+        if state == "FAILURE":
+            return {"task_id": task_id, "state": state, "error": str(result.result)}
+        return {"task_id": task_id, "state": state}
+    
     try:
-        # Get the original song
-        song = db.query(SongModel).filter(SongModel.id == song_id).first()
-        if not song:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Song not found"
-            )
-        
-        # Check if song is public or user owns it
-        if not song.is_public and song.creator_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions"
-            )
-        
-        music_generator = MusicGenerator()
-        result = await music_generator.remix_song(
-            original_song_id=song_id,
-            new_genre=request.get("new_genre", "Pop"),
-            new_tempo=request.get("new_tempo", 120),
-            new_key=request.get("new_key", "C")
-        )
-        return result
-    except HTTPException:
-        raise
+        return await run_in_threadpool(read_task)
     except Exception as e:
-        logger.error(f"Error remixing song: {str(e)}")
+        logger.error(f"Error fetching task {task_id}: {str(e)}")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to remix song: {str(e)}"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Task status is temporarily unavailable. Please try again later."
         )
 
 
-@router.get("/suggestions/{genre}")
-async def get_generation_suggestions(genre: str, theme: Optional[str] = None):
-    """Get generation suggestions for a genre"""
-    try:
-        # Return mock suggestions for now
-        return {
-            "genre": genre,
-            "recommended_tempos": [80, 100, 120, 140, 160],
-            "recommended_keys": ["C", "G", "D", "A", "E", "F"],
-            "recommended_styles": ["Upbeat", "Melancholic", "Energetic", "Calm", "Dramatic"],
-            "recommended_voice_types": ["Male", "Female", "Child", "Choir"],
-            "theme_suggestions": ["love", "adventure", "nostalgia", "celebration", "reflection"]
-        }
-    except Exception as e:
-        logger.error(f"Error getting suggestions: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get suggestions: {str(e)}"
-        )
+# Static metadata is serialized once at import and served with long-lived
+# caching headers; the ETag lets clients revalidate without a body.
+_METADATA_CACHE_CONTROL = "public, max-age=86400"
+
+
+def _precompute_json(payload: dict) -> Tuple[bytes, str]:
+    """Serialize a constant payload and derive its ETag"""
+    body = orjson.dumps(payload)
+    return body, f'"{hashlib.md5(body).hexdigest()}"'
+
+
+def _static_json_response(request: Request, precomputed: Tuple[bytes, str]) -> Response:
+    """Serve precomputed JSON, answering 304 when the client's copy is current"""
+    body, etag = precomputed
+    headers = {"Cache-Control": _METADATA_CACHE_CONTROL, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+_GENRES_JSON = _precompute_json({
+    "genres": ["Pop", "Rock", "Hip Hop", "R&B", "Country", "Electronic", "Jazz", "Classical", "Folk", "Blues", "Reggae", "Punk", "Metal", "Alternative", "Indie"]
+})
+_VOICE_TYPES_JSON = _precompute_json({
+    "voice_types": ["Male", "Female", "Child", "Robotic", "Choir", "Instrumental"]
+})
+_STYLES_JSON = _precompute_json({
+    "styles": ["Upbeat", "Melancholic", "Energetic", "Calm", "Dramatic", "Romantic", "Aggressive", "Dreamy", "Nostalgic", "Futuristic"]
+})
 
 
 @router.get("/metadata/genres")
-async def get_supported_genres():
+async def get_supported_genres(request: Request):
     """Get supported genres"""
-    return {
-        "genres": ["Pop", "Rock", "Hip Hop", "R&B", "Country", "Electronic", "Jazz", "Classical", "Folk", "Blues", "Reggae", "Punk", "Metal", "Alternative", "Indie"]
-    }
+    return _static_json_response(request, _GENRES_JSON)
 
 
 @router.get("/metadata/voice-types")
-async def get_supported_voice_types():
+async def get_supported_voice_types(request: Request):
     """Get supported voice types"""
-    return {
-        "voice_types": ["Male", "Female", "Child", "Robotic", "Choir", "Instrumental"]
-    }
+    return _static_json_response(request, _VOICE_TYPES_JSON)
 
 
 @router.get("/metadata/styles")
-async def get_supported_styles():
+async def get_supported_styles(request: Request):
     """Get supported styles"""
-    return {
-        "styles": ["Upbeat", "Melancholic", "Energetic", "Calm", "Dramatic", "Romantic", "Aggressive", "Dreamy", "Nostalgic", "Futuristic"]
-    }
+    return _static_json_response(request, _STYLES_JSON)
+
+
+# Mock suggestions, identical for every genre for now
+_GENERATION_SUGGESTIONS = {
+    "recommended_tempos": [80, 100, 120, 140, 160],
+    "recommended_keys": ["C", "G", "D", "A", "E", "F"],
+    "recommended_styles": ["Upbeat", "Melancholic", "Energetic", "Calm", "Dramatic"],
+    "recommended_voice_types": ["Male", "Female", "Child", "Choir"],
+    "theme_suggestions": ["love", "adventure", "nostalgia", "celebration", "reflection"]
+}
+
+
+@lru_cache(maxsize=256)
+def _suggestions_json(genre: str) -> Tuple[bytes, str]:
+    """Serialized suggestions per genre; bounded since genre is client input"""
+    return _precompute_json({"genre": genre, **_GENERATION_SUGGESTIONS})
+
+
+@router.get("/suggestions/{genre}")
+async def get_generation_suggestions(request: Request, genre: str, theme: Optional[str] = None):
+    """Get generation suggestions for a genre"""
+    return _static_json_response(request, _suggestions_json(genre))
+
+
+# Progress percentage reported for each generation step
+_STEP_PROGRESS = {
+    "queued": 5,
+    "initializing": 10,
+    "generating": 50,
+    "generating_lyrics": 30,
+    "generating_midi": 50,
+    "generating_audio": 80,
+    "finalizing": 95,
+    "completed": 100,
+    "error": 0
+}
 
 
 @router.get("/{song_id}/status")
-def get_generation_status(
+async def get_generation_status(
     song_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Get generation status for a song"""
-    song = db.query(SongModel).filter(SongModel.id == song_id).first()
-    if not song:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Song not found"
-        )
+    # Polled frequently: fetch only the columns needed, not lyrics/features
+    row = (await db.execute(lambda_stmt(
+        lambda: select(SongModel.generation_params, SongModel.creator_id)
+        .where(SongModel.id == song_id)
+    ))).one_or_none()
+    if row is None:
+        raise _song_access_error(None)
     
-    # Check if user owns the song
-    if song.creator_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions"
-        )
+    # Only the owner may poll generation status
+    if row.creator_id != current_user.id:
+        raise _song_access_error(song_id)
+    
+    generation_params = row.generation_params or {}
+    generation_status = generation_params.get("generation_status")
+    task_id = generation_params.get("task_id")
+    
+    step = generation_params.get("generation_step", "unknown")
     
-    generation_params = song.generation_params or {}
+    # The worker only writes the outcome to the row; until then the task
+    # state tells a queued job from a running one (queued -> running ->
+    # completed | failed), or shows that the job was lost
+    task_state = None
+    if task_id and generation_status not in ("completed", "failed"):
+        task_state = await _task_state(task_id)
+        if task_state == "STARTED":
+            generation_status, step = "running", "generating"
     
     return {
         "song_id": song_id,
-        "status": generation_params.get("generation_status", "unknown"),
-        "step": generation_params.get("generation_step", "unknown"),
-        "progress": _get_progress_percentage(generation_params.get("generation_step", "unknown")),
+        "status": generation_status or "unknown",
+        "step": step,
+        "progress": _STEP_PROGRESS.get(step, 0),
         "audio_engine": generation_params.get("audio_engine", "unknown"),
         "audio_quality": generation_params.get("audio_quality", "unknown"),
         "error": generation_params.get("user_friendly_error"),
         "suggestions": generation_params.get("suggestions", []),
         "files_generated": generation_params.get("files_generated", {}),
-        "is_completed": generation_params.get("generation_status") == "completed",
-        "has_error": generation_params.get("generation_status") == "failed"
+        "is_completed": generation_status == "completed",
+        "has_error": generation_status == "failed",
+        "task_state": task_state
     }
 
 
-def _get_progress_percentage(step: str) -> int:
-    """Get progress percentage based on generation step"""
-    step_progress = {
-        "initializing": 10,
-        "generating_lyrics": 30,
-        "generating_midi": 50,
-        "generating_audio": 80,
-        "finalizing": 95,
-        "completed": 100,
-        "error": 0
-    }
-    return step_progress.get(step, 0)
+async def _task_state(task_id: str) -> Optional[str]:
+    """Celery state of a generation task, or None if the result backend is unreachable"""
+    try:
+        return await run_in_threadpool(lambda: celery_app.AsyncResult(task_id).state)
+    except Exception as e:
+        logger.warning(f"Could not fetch state of task {task_id}: {str(e)}")
+        return None
+
+
+# Availability changes on the order of minutes, so probe results are reused
+# for a short window instead of re-checking MusicGen/Azure on every poll.
+_system_status_cache: TTLCache = TTLCache(maxsize=1, ttl=30)
 
 
 @router.post("/check-system-status")
 async def check_system_status():
     """Check system status and capabilities"""
     try:
-        # Initialize MusicGenerator to check capabilities
-        music_generator = MusicGenerator()
-        
-        # Check MusicGen availability
-        musicgen_available = False
-        musicgen_info = {}
-        
-        if hasattr(music_generator, 'musicgen_synthesizer'):
-            musicgen_synthesizer = music_generator.musicgen_synthesizer
-            if musicgen_synthesizer and musicgen_synthesizer.is_available():
-                musicgen_available = True
-                musicgen_info = musicgen_synthesizer.get_model_info()
-        
-        # Check Azure OpenAI availability
-        azure_openai_available = False
-        try:
-            from ...services.azure_openai_client import azure_openai_client
-            azure_openai_available = azure_openai_client.is_available()
-        except Exception:
-            pass
-        
-        return {
-            "system_status": "operational",
-            "audio_generation": {
-                "musicgen_available": musicgen_available,
-                "musicgen_info": musicgen_info,
-                "fallback_synthesizer": True,
-                "recommended_engine": "musicgen" if musicgen_available else "basic_synthesizer"
-            },
-            "lyrics_generation": {
-                "azure_openai_available": azure_openai_available,
-                "fallback_templates": True
-            },
-            "capabilities": {
-                "high_quality_audio": musicgen_available,
-                "ai_lyrics": azure_openai_available,
-                "midi_generation": True,
-                "multiple_genres": True
-            },
-            "recommendations": _get_system_recommendations(musicgen_available, azure_openai_available)
-        }
+        system_status = _system_status_cache.get("status")
+        if system_status is None:
+            system_status = _system_status_cache["status"] = await _compute_system_status()
+        return system_status
         
     except Exception as e:
         logger.error(f"Error checking system status: {str(e)}")
@@ -727,6 +741,52 @@ async def check_system_status():
         }
 
 
+async def _compute_system_status() -> dict:
+    """Probe MusicGen and Azure OpenAI and build the status report"""
+    # Shared MusicGenerator, loaded off the event loop on first use; a failed
+    # initialization reports as degraded
+    music_generator = await get_music_generator_async()
+    
+    # Check MusicGen availability
+    musicgen_available = False
+    musicgen_info = {}
+    
+    if hasattr(music_generator, 'musicgen_synthesizer'):
+        musicgen_synthesizer = music_generator.musicgen_synthesizer
+        if musicgen_synthesizer and musicgen_synthesizer.is_available():
+            musicgen_available = True
+            musicgen_info = musicgen_synthesizer.get_model_info()
+    
+    # Check Azure OpenAI availability
+    azure_openai_available = False
+    try:
+        azure_openai_available = get_azure_openai_client().is_available()
+    except Exception:
+        pass
+    
+    return {
+        "system_status": "operational",
+        "audio_generation": {
+            "musicgen_available": musicgen_available,
+            "musicgen_info": musicgen_info,
+            "fallback_synthesizer": True,
+            "recommended_engine": "musicgen" if musicgen_available else "basic_synthesizer"
+        },
+        "lyrics_generation": {
+            "azure_openai_available": azure_openai_available,
+            "fallback_templates": True
+        },
+        "capabilities": {
+            "high_quality_audio": musicgen_available,
+            "ai_lyrics": azure_openai_available,
+            "midi_generation": True,
+            "multiple_genres": True
+        },
+        "recommendations": _get_system_recommendations(musicgen_available, azure_openai_available)
+    }
+
+
+@lru_cache(maxsize=4)
 def _get_system_recommendations(musicgen_available: bool, azure_openai_available: bool) -> list:
     """Get system recommendations based on availability"""
     recommendations = []
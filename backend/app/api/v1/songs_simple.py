@@ -1,32 +1,40 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Query, Response
+from pydantic import BaseModel
+from typing import List, Dict, Any, Optional, Tuple
+import itertools
 import json
 import os
 from datetime import datetime
+from ..pagination import decode_cursor, encode_cursor
 
 router = APIRouter()
 
-# Simple in-memory storage for demo purposes
-songs_storage = []
+# Simple in-memory storage for demo purposes, keyed by song id. Handlers
+# never await while mutating it, so no lock is needed.
+songs_storage: Dict[int, Dict[str, Any]] = {}
+_next_id = itertools.count(1)
+
+
+class MockSongGenerate(BaseModel):
+    title: str = "Untitled Song"
+    genre: str = "pop"
+    lyrics: str = ""
+
 
 @router.post("/generate")
-async def generate_song(request: Dict[str, Any]):
+async def generate_song(request: MockSongGenerate):
     """
     Simple song generation endpoint that returns a mock response
     until ML dependencies are properly installed
     """
     try:
-        title = request.get("title", "Untitled Song")
-        genre = request.get("genre", "pop")
-        lyrics = request.get("lyrics", "")
-        
         # Create a mock song response
-        song_id = len(songs_storage) + 1
+        song_id = next(_next_id)
         song_data = {
             "id": song_id,
-            "title": title,
-            "genre": genre,
-            "lyrics": lyrics,
+            "title": request.title,
+            "genre": request.genre,
+            "lyrics": request.lyrics,
             "status": "generated",
             "created_at": datetime.now().isoformat(),
             "audio_url": None,  # Would be populated when ML is working
@@ -34,7 +42,7 @@ async def generate_song(request: Dict[str, Any]):
             "message": "Song generation is temporarily disabled. ML dependencies need to be installed."
         }
         
-        songs_storage.append(song_data)
+        songs_storage[song_id] = song_data
         
         return {
             "success": True,
@@ -45,51 +53,64 @@ async def generate_song(request: Dict[str, Any]):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating song: {str(e)}")
 
+def _page(cursor: Optional[str], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of songs, newest first, and the cursor of the next page;
+    the same keyset contract as the database-backed songs router"""
+    before_id = decode_cursor(cursor) if cursor else None
+    ids = (song_id for song_id in reversed(songs_storage) if before_id is None or song_id < before_id)
+    page = [songs_storage[song_id] for song_id in itertools.islice(ids, limit + 1)]
+    if len(page) > limit:
+        return page[:limit], encode_cursor(page[limit - 1]["id"])
+    return page, None
+
 @router.get("/")
-async def list_songs():
-    """List all generated songs"""
+async def list_songs(cursor: Optional[str] = None, limit: int = Query(20, ge=1, le=100)):
+    """List generated songs"""
+    songs, next_cursor = _page(cursor, limit)
     return {
         "success": True,
-        "songs": songs_storage,
-        "total": len(songs_storage)
+        "songs": songs,
+        "total": len(songs_storage),
+        "per_page": limit,
+        "next_cursor": next_cursor
     }
 
 @router.get("/my-songs")
-async def get_my_songs(skip: int = 0, limit: int = 20):
-    """Get current user's songs"""
+async def get_my_songs(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Get current user's songs; the next page's cursor is sent in X-Next-Cursor"""
     # For now, return all songs since we don't have user authentication
-    start = skip
-    end = skip + limit
-    user_songs = songs_storage[start:end]
+    user_songs, next_cursor = _page(cursor, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     return user_songs
 
 @router.get("/{song_id}")
 async def get_song(song_id: int):
     """Get a specific song by ID"""
-    for song in songs_storage:
-        if song["id"] == song_id:
-            return {
-                "success": True,
-                "song": song
-            }
+    song = songs_storage.get(song_id)
+    if song is None:
+        raise HTTPException(status_code=404, detail="Song not found")
     
-    raise HTTPException(status_code=404, detail="Song not found")
+    return {
+        "success": True,
+        "song": song
+    }
 
 @router.delete("/{song_id}")
 async def delete_song(song_id: int):
     """Delete a song by ID"""
-    global songs_storage
-    original_length = len(songs_storage)
-    songs_storage = [song for song in songs_storage if song["id"] != song_id]
-    
-    if len(songs_storage) < original_length:
-        return {
-            "success": True,
-            "message": f"Song {song_id} deleted successfully"
-        }
-    else:
+    if songs_storage.pop(song_id, None) is None:
         raise HTTPException(status_code=404, detail="Song not found")
+    
+    return {
+        "success": True,
+        "message": f"Song {song_id} deleted successfully"
+    }
 
 @router.get("/status/ml")
 async def ml_status():
@@ -1,15 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, UploadFile, File
+from fastapi.routing import APIRoute
 from sqlalchemy.orm import Session
 from typing import Optional
+from ...core.config import settings
 from ...core.database import get_db
 from ...api.deps import get_current_active_user
 from ...models.user import User as UserModel
+import aiofiles
 import os
 import uuid
 import logging
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+
+# Slack on top of max_file_size for the multipart boundaries and part headers
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadRoute(APIRoute):
+    """Rejects requests whose declared Content-Length is over the limit before
+    the multipart body is read and spooled"""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def limited_handler(request: Request) -> Response:
+            content_length = request.headers.get("content-length", "")
+            if content_length.isdigit() and int(content_length) > settings.max_file_size + MULTIPART_OVERHEAD:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"File exceeds the {settings.max_file_size} byte limit"
+                )
+            return await handler(request)
+
+        return limited_handler
+
+
+router = APIRouter(route_class=UploadRoute)
 
 # Create upload directories if they don't exist
 UPLOAD_DIR = "backend/uploads"
@@ -19,6 +46,42 @@ IMAGE_DIR = os.path.join(UPLOAD_DIR, "images")
 os.makedirs(AUDIO_DIR, exist_ok=True)
 os.makedirs(IMAGE_DIR, exist_ok=True)
 
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+AUDIO_EXTENSIONS = frozenset({".mp3", ".wav", ".flac"})
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".webp"})
+
+
+def _upload_extension(file: UploadFile, default: str, allowed: frozenset) -> str:
+    """Lowercased extension of the uploaded file name, if it is allowed"""
+    extension = os.path.splitext(file.filename)[1].lower() if file.filename else default
+    if extension not in allowed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported file type; expected one of {', '.join(sorted(allowed))}"
+        )
+    return extension
+
+
+async def _save_upload(file: UploadFile, file_path: str) -> None:
+    """Stream an upload to disk in chunks, rejecting it once it exceeds max_file_size"""
+    total = 0
+    try:
+        async with aiofiles.open(file_path, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                total += len(chunk)
+                if total > settings.max_file_size:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File exceeds the {settings.max_file_size} byte limit"
+                    )
+                await out.write(chunk)
+    except BaseException:
+        # Don't leave a partial file behind
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+
 
 @router.post("/audio")
 async def upload_audio(
@@ -37,17 +100,17 @@ async def upload_audio(
             )
         
         # Generate unique filename
-        file_extension = os.path.splitext(file.filename)[1] if file.filename else '.mp3'
+        file_extension = _upload_extension(file, '.mp3', AUDIO_EXTENSIONS)
         unique_filename = f"{uuid.uuid4()}{file_extension}"
         file_path = os.path.join(AUDIO_DIR, unique_filename)
         
         # Save file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await _save_upload(file, file_path)
         
         return {"file_path": file_path}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading audio file: {str(e)}")
         raise HTTPException(
@@ -72,17 +135,17 @@ async def upload_image(
             )
         
         # Generate unique filename
-        file_extension = os.path.splitext(file.filename)[1] if file.filename else '.jpg'
+        file_extension = _upload_extension(file, '.jpg', IMAGE_EXTENSIONS)
         unique_filename = f"{uuid.uuid4()}{file_extension}"
         file_path = os.path.join(IMAGE_DIR, unique_filename)
         
         # Save file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await _save_upload(file, file_path)
         
         return {"file_path": file_path}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading image file: {str(e)}")
         raise HTTPException(
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from ...core.database import get_db
+from ...core.database import get_async_db
 from ...schemas.user import User, UserUpdate
 from ...models.user import User as UserModel
 from ...api.deps import get_current_active_user
@@ -10,57 +11,63 @@ router = APIRouter()
 
 
 @router.get("/me", response_model=User)
-def read_user_me(current_user: UserModel = Depends(get_current_active_user)):
+async def read_user_me(current_user: UserModel = Depends(get_current_active_user)):
     """Get current user profile"""
     return current_user
 
 
 @router.put("/me", response_model=User)
-def update_user_me(
+async def update_user_me(
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """Update current user profile"""
-    update_data = user_update.dict(exclude_unset=True)
+    update_data = user_update.model_dump(exclude_unset=True)
     
-    # Check if email is being updated and if it's already taken
+    # Check the new email and username against other users in one query
+    conflicts = []
     if "email" in update_data:
-        existing_user = db.query(UserModel).filter(
-            UserModel.email == update_data["email"],
-            UserModel.id != current_user.id
-        ).first()
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-    
-    # Check if username is being updated and if it's already taken
+        conflicts.append(UserModel.email == update_data["email"])
     if "username" in update_data:
-        existing_user = db.query(UserModel).filter(
-            UserModel.username == update_data["username"],
-            UserModel.id != current_user.id
-        ).first()
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
-            )
-    
-    # Update user
-    for field, value in update_data.items():
-        setattr(current_user, field, value)
+        conflicts.append(UserModel.username == update_data["username"])
+    if conflicts:
+        existing = (await db.execute(
+            select(UserModel.email, UserModel.username)
+            .where(UserModel.id != current_user.id, or_(*conflicts))
+            .limit(1)
+        )).first()
+        if existing:
+            if "email" in update_data and existing.email == update_data["email"]:
+                detail = "Email already registered"
+            else:
+                detail = "Username already taken"
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
     
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+    if not update_data:
+        user = await db.get(UserModel, current_user.id)
+    else:
+        # The current user is a detached stand-in while auth is disabled, so
+        # update the stored row rather than the object
+        user = await db.scalar(
+            update(UserModel)
+            .where(UserModel.id == current_user.id)
+            .values(**update_data)
+            .returning(UserModel)
+        )
+        await db.commit()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
 
 
 @router.get("/{user_id}", response_model=User)
-def read_user(user_id: int, db: Session = Depends(get_db)):
+async def read_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get user by ID (public profile)"""
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
+    user = await db.get(UserModel, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -70,11 +77,11 @@ def read_user(user_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=List[User])
-def read_users(
+async def read_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get list of users (public profiles)"""
-    users = db.query(UserModel).offset(skip).limit(limit).all()
-    return users
+    users = await db.scalars(select(UserModel).offset(skip).limit(limit))
+    return users.all()
@@ -0,0 +1,112 @@
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+import orjson
+import redis
+import redis.asyncio as aioredis
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Per-request arguments that must never be part of a response cache key;
+# a fresh session object would make every key unique and defeat the cache.
+_UNCACHEABLE_KWARGS = frozenset({"db", "session"})
+
+
+def no_db_key_builder(
+    func: Callable[..., Any],
+    namespace: str = "",
+    *,
+    request: Any = None,
+    response: Any = None,
+    args: Tuple[Any, ...] = (),
+    kwargs: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Response cache key builder that ignores database session arguments"""
+    cacheable = {k: v for k, v in (kwargs or {}).items() if k not in _UNCACHEABLE_KWARGS}
+    cache_key = hashlib.md5(
+        f"{func.__module__}:{func.__name__}:{args}:{cacheable}".encode()
+    ).hexdigest()
+    return f"{namespace}:{cache_key}"
+
+
+# Song responses cached as serialized JSON bytes
+SONG_CACHE_TTL = 60
+# Set of every cached list key, so invalidation doesn't need a SCAN
+_SONG_LIST_INDEX = "songs:list:keys"
+
+
+# Azure OpenAI replies, keyed by everything that determines the reply
+LLM_CACHE_TTL = 7 * 24 * 3600
+
+
+def llm_key(model: str, messages: Any, max_tokens: int, temperature: float) -> str:
+    digest = hashlib.blake2b(
+        orjson.dumps([model, max_tokens, temperature, messages]), digest_size=16
+    ).hexdigest()
+    return f"llm:{digest}"
+
+
+def song_key(song_id: int) -> str:
+    return f"song:{song_id}"
+
+
+def song_list_key(genre: Optional[str], creator_id: Optional[int], cursor: Optional[str], limit: int) -> str:
+    return f"songs:list:{genre}:{creator_id}:{cursor}:{limit}"
+
+
+@lru_cache(maxsize=1)
+def get_redis() -> aioredis.Redis:
+    """Shared async Redis client (connections are pooled)"""
+    return aioredis.from_url(settings.redis_url)
+
+
+async def close_redis() -> None:
+    if get_redis.cache_info().currsize:
+        await get_redis().aclose()
+        get_redis.cache_clear()
+
+
+# A cache outage only costs the database round-trip, so Redis errors are
+# logged and treated as misses rather than failing the request.
+
+async def get_cached(key: str) -> Optional[bytes]:
+    try:
+        return await get_redis().get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Response cache read failed: {str(e)}")
+        return None
+
+
+async def set_cached(key: str, value: bytes, *, is_list: bool = False, ttl: int = SONG_CACHE_TTL) -> None:
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.setex(key, ttl, value)
+            if is_list:
+                pipe.sadd(_SONG_LIST_INDEX, key)
+                pipe.expire(_SONG_LIST_INDEX, SONG_CACHE_TTL)
+            await pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Response cache write failed: {str(e)}")
+
+
+async def invalidate_songs(*song_ids: int) -> None:
+    """Drop cached song lists plus the given songs"""
+    try:
+        client = get_redis()
+        list_keys = await client.smembers(_SONG_LIST_INDEX)
+        await client.delete(_SONG_LIST_INDEX, *list_keys, *map(song_key, song_ids))
+    except redis.RedisError as e:
+        logger.warning(f"Response cache invalidation failed: {str(e)}")
+
+
+def invalidate_songs_sync(*song_ids: int) -> None:
+    """invalidate_songs for the Celery worker, which has no event loop"""
+    try:
+        client = redis.Redis.from_url(settings.redis_url)
+        with client:
+            list_keys = client.smembers(_SONG_LIST_INDEX)
+            client.delete(_SONG_LIST_INDEX, *list_keys, *map(song_key, song_ids))
+    except redis.RedisError as e:
+        logger.warning(f"Response cache invalidation failed: {str(e)}")
@@ -0,0 +1,23 @@
+from celery import Celery
+from .config import settings
+
+# Worker: celery -A app.core.celery_app worker --loglevel=info
+celery_app = Celery(
+    "genxcover",
+    broker=settings.redis_url,
+    backend=settings.redis_url,
+    include=["app.tasks"],
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    # Generations run for minutes; hand each worker one at a time and only
+    # acknowledge once finished so a crashed worker's job is redelivered
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    # Report STARTED once a worker picks a job up; generation status polls
+    # read it instead of the worker committing a progress step
+    task_track_started=True,
+)
@@ -8,9 +8,30 @@ class Settings(BaseSettings):
     version: str = "1.0.0"
     debug: bool = True
     api_v1_str: str = "/api/v1"
+    # Pre-generated OpenAPI schema (see export_openapi.py); generated lazily if unset
+    openapi_schema_path: str = ""
+    # Public origin that generated media URLs are built from
+    public_base_url: str = "http://localhost:8005"
     
     # Database
     database_url: str = "sqlite:///./genxcover.db"
+    db_pool_size: int = 25
+    db_max_overflow: int = 25
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    # Stale connections are retired by recycle and TCP keepalives instead of
+    # a SELECT 1 on every checkout
+    db_pool_pre_ping: bool = False
+    db_pool_use_lifo: bool = True
+    # Open db_pool_size connections at startup instead of on first use
+    db_pool_warmup: bool = True
+    db_tcp_keepalives_idle: int = 60
+    db_prepared_statement_cache_size: int = 256
+    # Create missing tables at startup; turn off where migrations own the schema
+    db_create_tables: bool = True
+    
+    # Redis: Celery broker/result backend and the response cache
+    redis_url: str = "redis://localhost:6379"
     
     # CORS
     backend_cors_origins: List[str] = [
@@ -26,6 +47,11 @@ class Settings(BaseSettings):
     secret_key: str = "your-secret-key-here-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    # Web workers per host, as given to uvicorn/gunicorn via WEB_CONCURRENCY
+    web_concurrency: int = 1
+    # bcrypt processes per web worker; 0 splits the host's cores between
+    # the web workers
+    password_hash_workers: int = 0
     
     # API Keys (optional)
     openai_api_key: str = ""
@@ -40,6 +66,9 @@ class Settings(BaseSettings):
     azure_openai_max_tokens: str = "4000"
     azure_openai_temperature: str = "0.7"
     
+    # Uploads
+    max_file_size: int = 100 * 1024 * 1024
+    
     # Search Configuration
     max_search_results: int = 100
     default_search_timeout: int = 30
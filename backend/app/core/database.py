@@ -1,41 +1,139 @@
-from sqlalchemy import create_engine
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from contextvars import ContextVar
+from typing import Optional
+from fastapi import Depends
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from .config import settings
 
-# Sync database setup
-engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+logger = logging.getLogger(__name__)
 
-# Async database setup (for PostgreSQL)
-if settings.database_url.startswith("postgresql"):
-    async_engine = create_async_engine(
-        settings.database_url.replace("postgresql://", "postgresql+asyncpg://")
-    )
-    AsyncSessionLocal = sessionmaker(
-        async_engine, class_=AsyncSession, expire_on_commit=False
-    )
+_is_sqlite = settings.database_url.startswith("sqlite")
+
+# Connection pool tuning shared by the sync and async engines. SQLite keeps
+# SQLAlchemy's default pool since connections are local file handles.
+_pool_options = {} if _is_sqlite else {
+    "pool_size": settings.db_pool_size,
+    "max_overflow": settings.db_max_overflow,
+    "pool_timeout": settings.db_pool_timeout,
+    "pool_recycle": settings.db_pool_recycle,
+    "pool_pre_ping": settings.db_pool_pre_ping,
+    # Reuse the most recently returned connection so idle extras can age out
+    "pool_use_lifo": settings.db_pool_use_lifo,
+}
+
+# Sync database setup
+if _is_sqlite:
+    engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
 else:
-    async_engine = None
-    AsyncSessionLocal = None
+    engine = create_engine(
+        settings.database_url,
+        poolclass=QueuePool,
+        connect_args={
+            "keepalives": 1,
+            "keepalives_idle": settings.db_tcp_keepalives_idle,
+        },
+        **_pool_options
+    )
+
+# Identifies the request a scoped session belongs to. FastAPI may run the
+# setup and teardown of a sync dependency on different threadpool threads,
+# so sessions are scoped per request rather than per thread.
+_request_scope: ContextVar[Optional[object]] = ContextVar("_request_scope", default=None)
+
+SessionLocal = scoped_session(
+    sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine),
+    scopefunc=_request_scope.get,
+)
+
+
+def _async_database_url(url: str) -> str:
+    """Map a sync database URL onto its async driver"""
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+# asyncpg has no client-side keepalive option, so the server probes instead.
+# JIT only adds planning time to the short OLTP queries issued here.
+_async_connect_args = {} if _is_sqlite else {
+    "server_settings": {
+        "jit": "off",
+        "tcp_keepalives_idle": str(settings.db_tcp_keepalives_idle),
+    },
+    "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+}
+
+# Async database setup (asyncpg for PostgreSQL, aiosqlite for SQLite)
+async_engine = create_async_engine(
+    _async_database_url(settings.database_url),
+    connect_args=_async_connect_args,
+    **_pool_options
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+# INSERT construct of the configured dialect, for ON CONFLICT DO NOTHING
+insert_or_ignore = postgresql.insert if async_engine.dialect.name == "postgresql" else sqlite.insert
+
+
+async def warm_async_pool() -> None:
+    """Fill the async pool at startup so the first requests don't each pay
+    for a TCP connect and authentication"""
+    if _is_sqlite or not settings.db_pool_warmup:
+        return
+    try:
+        async with AsyncExitStack() as stack:
+            await asyncio.gather(*(
+                stack.enter_async_context(async_engine.connect())
+                for _ in range(settings.db_pool_size)
+            ))
+    except Exception as e:
+        # Not fatal: connections are still opened on demand
+        logger.warning(f"Database pool warm-up failed: {str(e)}")
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets readers run alongside a writer instead of queueing behind it;
+    with WAL, synchronous=NORMAL is still crash-safe and skips most fsyncs"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+if _is_sqlite:
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
 
 Base = declarative_base()
 
 
-def get_db():
+async def _bind_request_scope() -> object:
+    """Open a session scope for the current request"""
+    scope = object()
+    _request_scope.set(scope)
+    return scope
+
+
+def get_db(scope: object = Depends(_bind_request_scope)):
     """Dependency to get database session"""
-    db = SessionLocal()
     try:
-        yield db
+        yield SessionLocal()
     finally:
-        db.close()
+        SessionLocal.remove()
 
 
 async def get_async_db():
     """Dependency to get async database session"""
-    if AsyncSessionLocal is None:
-        raise RuntimeError("Async database not configured")
-    
     async with AsyncSessionLocal() as session:
         yield session
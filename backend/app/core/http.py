@@ -0,0 +1,20 @@
+from functools import lru_cache
+import httpx
+
+# Outbound calls to external APIs (Azure OpenAI) share one pooled client, so
+# requests reuse kept-alive connections instead of a TCP + TLS handshake each
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+HTTP_TIMEOUT = httpx.Timeout(60.0)
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.AsyncClient:
+    """Shared async HTTP client. Its connections belong to the event loop that
+    opened them, so a process must run its calls on a single loop."""
+    return httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+
+
+async def close_http_client() -> None:
+    if get_http_client.cache_info().currsize:
+        await get_http_client().aclose()
+        get_http_client.cache_clear()
@@ -1,3 +1,7 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional, Union
 from jose import JWTError, jwt
@@ -5,8 +9,12 @@ from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from .config import settings
 
+# Keep bcrypt at its default cost (12 rounds); offloading is what keeps
+# logins from blocking, lowering rounds would only weaken stored hashes.
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+_password_pool: Optional[ProcessPoolExecutor] = None
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
@@ -42,3 +50,46 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
+
+
+def _password_pool_size() -> int:
+    """bcrypt processes for this web worker, so that all workers on the host
+    together use at most one process per core"""
+    if settings.password_hash_workers > 0:
+        return settings.password_hash_workers
+    return max(1, (os.cpu_count() or 1) // max(1, settings.web_concurrency))
+
+
+def get_password_pool() -> ProcessPoolExecutor:
+    """Process pool used for bcrypt work, created on first use"""
+    global _password_pool
+    if _password_pool is None:
+        # Spawned rather than forked: by now this process runs threads (the
+        # threadpool, database drivers), which fork would copy mid-state
+        _password_pool = ProcessPoolExecutor(
+            max_workers=_password_pool_size(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _password_pool
+
+
+def shutdown_password_pool() -> None:
+    """Shut down the bcrypt process pool if it was started"""
+    global _password_pool
+    if _password_pool is not None:
+        _password_pool.shutdown(wait=False, cancel_futures=True)
+        _password_pool = None
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the process pool so logins scale across cores"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_password_pool(), verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the process pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_pool(), get_password_hash, password)
@@ -1,19 +1,73 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from .core.config import settings
-from .core.database import engine, Base
+from .core.database import async_engine, engine, Base, warm_async_pool
+from .core.cache import close_redis
+from .core.http import close_http_client
+from .core.security import shutdown_password_pool
 from .api.v1.api import api_router
+from pathlib import Path
+import orjson
 import os
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+uploads_dir = "uploads"
+
+
+class UploadsStaticFiles(StaticFiles):
+    """Uploaded and generated media; file names are unique per upload or
+    generation, so clients may cache them indefinitely"""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=86400, immutable"
+        return response
+
+
+class APIGZipMiddleware(GZipMiddleware):
+    """GZip everything except /uploads, whose audio and images are already
+    compressed, and event streams, which the compressor would hold back"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and (
+            scope["path"].startswith("/uploads/") or scope["path"].endswith("/stream")
+        ):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown"""
+    # Done here rather than at import so reloads and test collection don't
+    # touch the database or the filesystem
+    if settings.db_create_tables:
+        await run_in_threadpool(Base.metadata.create_all, bind=engine)
+    await warm_async_pool()
+    for subdir in ("audio", "midi", "images"):
+        os.makedirs(os.path.join(uploads_dir, subdir), exist_ok=True)
+    yield
+    await close_redis()
+    await close_http_client()
+    await async_engine.dispose()
+    shutdown_password_pool()
+
 
 app = FastAPI(
     title=settings.app_name,
     version=settings.version,
     debug=settings.debug,
-    openapi_url=f"{settings.api_v1_str}/openapi.json"
+    openapi_url=f"{settings.api_v1_str}/openapi.json",
+    # Interactive docs are only served in debug; the schema itself stays available
+    docs_url="/docs" if settings.debug else None,
+    redoc_url="/redoc" if settings.debug else None,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Set up CORS
@@ -23,21 +77,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination cursor for /songs/my-songs
+    expose_headers=["X-Next-Cursor"],
 )
 
-# Create uploads directory if it doesn't exist
-uploads_dir = "uploads"
-os.makedirs(uploads_dir, exist_ok=True)
-os.makedirs(f"{uploads_dir}/audio", exist_ok=True)
-os.makedirs(f"{uploads_dir}/midi", exist_ok=True)
-os.makedirs(f"{uploads_dir}/images", exist_ok=True)
+app.add_middleware(APIGZipMiddleware, minimum_size=1024)
 
-# Mount static files for serving uploaded content
-app.mount("/uploads", StaticFiles(directory=uploads_dir), name="uploads")
+# Mount static files for serving uploaded content; the directory is created
+# in lifespan, before the first request. Large deployments should serve
+# /uploads from the reverse proxy (sendfile) instead.
+app.mount("/uploads", UploadsStaticFiles(directory=uploads_dir, check_dir=False), name="uploads")
 
 # Include API routes
 app.include_router(api_router, prefix=settings.api_v1_str)
 
+# Load the build-time OpenAPI schema so workers don't each regenerate it
+if settings.openapi_schema_path and Path(settings.openapi_schema_path).is_file():
+    app.openapi_schema = orjson.loads(Path(settings.openapi_schema_path).read_bytes())
+
 
 @app.get("/")
 def read_root():
@@ -45,8 +102,8 @@ def read_root():
     return {
         "message": f"Welcome to {settings.app_name} API",
         "version": settings.version,
-        "docs": "/docs",
-        "redoc": "/redoc"
+        "docs": app.docs_url,
+        "redoc": app.redoc_url
     }
 
 
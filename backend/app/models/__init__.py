@@ -2,5 +2,6 @@ from .user import User
 from .song import Song
 from .recording import Recording
 from .prediction import PopularityPrediction
+from .generation_job import GenerationJob
 
-__all__ = ["User", "Song", "Recording", "PopularityPrediction"]
+__all__ = ["User", "Song", "Recording", "PopularityPrediction", "GenerationJob"]
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, DateTime, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+
+class GenerationJob(Base):
+    """Generation request parameters, stored once per distinct request and
+    referenced from songs by params_hash"""
+    __tablename__ = "generation_jobs"
+
+    params_hash = Column(String(32), primary_key=True)
+    params = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    
+    # Outcome of the first successful generation ("song" column values and
+    # "status" for generation_params), reused by identical requests
+    result = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -34,13 +34,14 @@ class PopularityPrediction(Base):
     analysis_timestamp = Column(DateTime(timezone=True), server_default=func.now())
     
     # Foreign Keys
-    song_id = Column(Integer, ForeignKey("songs.id"), nullable=False)
+    # Indexed so deleting songs doesn't scan this table for the FK check
+    song_id = Column(Integer, ForeignKey("songs.id"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
-    # Relationships
-    song = relationship("Song", back_populates="predictions")
-    user = relationship("User", back_populates="predictions")
+    # Relationships (never lazy-loaded, see Song)
+    song = relationship("Song", back_populates="predictions", lazy="raise")
+    user = relationship("User", back_populates="predictions", lazy="raise")
@@ -1,11 +1,18 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, JSON, Boolean, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 from ..core.database import Base
 
+_JSON = JSON().with_variant(JSONB(), "postgresql")
+
 
 class Recording(Base):
     __tablename__ = "recordings"
+    __table_args__ = (
+        # A user's recordings in chronological order; also serves user_id lookups
+        Index("ix_recordings_user_created", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -22,13 +29,13 @@ class Recording(Base):
     bit_depth = Column(Integer, nullable=True)
     
     # Recording settings
-    effects_applied = Column(JSON, nullable=True)  # List of effects and their parameters
-    recording_settings = Column(JSON, nullable=True)
+    effects_applied = Column(_JSON, nullable=True)  # List of effects and their parameters
+    recording_settings = Column(_JSON, nullable=True)
     
     # Multi-track support
     track_number = Column(Integer, default=1)
     is_master_track = Column(Boolean, default=True)
-    parent_recording_id = Column(Integer, ForeignKey("recordings.id"), nullable=True)
+    parent_recording_id = Column(Integer, ForeignKey("recordings.id"), nullable=True, index=True)
     
     # Status
     is_processed = Column(Boolean, default=False)
@@ -36,13 +43,15 @@ class Recording(Base):
     
     # Foreign Keys
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    song_id = Column(Integer, ForeignKey("songs.id"), nullable=True)  # Optional link to generated song
+    song_id = Column(Integer, ForeignKey("songs.id"), nullable=True, index=True)  # Optional link to generated song
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
-    # Relationships
-    user = relationship("User", back_populates="recordings")
-    song = relationship("Song", back_populates="recordings")
-    child_tracks = relationship("Recording", backref="parent_track", remote_side=[id])
+    # Relationships (never lazy-loaded, see Song)
+    user = relationship("User", back_populates="recordings", lazy="raise")
+    song = relationship("Song", back_populates="recordings", lazy="raise")
+    child_tracks = relationship(
+        "Recording", backref=backref("parent_track", lazy="raise"), remote_side=[id], lazy="raise"
+    )
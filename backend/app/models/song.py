@@ -1,12 +1,42 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, JSON, Boolean, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..core.database import Base
 
+# Binary JSON on PostgreSQL: TOAST-compressed and mergeable server-side
+_JSON = JSON().with_variant(JSONB(), "postgresql")
+
 
 class Song(Base):
     __tablename__ = "songs"
-
+    __table_args__ = (
+        # Lists are paged newest first by id, so each index ends in id and the
+        # keyset scan reads rows already in order. Public listings use partial
+        # indexes; SQLite only matches a partial index whose WHERE appears
+        # verbatim in the query, and SQLAlchemy renders `is_public == True`
+        # there as `is_public = 1`.
+        Index(
+            "ix_songs_public_recent", "id",
+            postgresql_where=text("is_public"),
+            sqlite_where=text("is_public = 1"),
+        ),
+        Index(
+            "ix_songs_public_genre", "genre", "id",
+            postgresql_where=text("is_public"),
+            sqlite_where=text("is_public = 1"),
+        ),
+        # Per-creator listing (my-songs, and public songs by creator)
+        Index("ix_songs_creator_id_id", "creator_id", "id"),
+        # Recently generated songs, for status dashboards
+        Index("ix_songs_generated_at", "generated_at"),
+        # Containment (@>) queries on the analysis results; PostgreSQL only
+        Index(
+            "ix_songs_audio_features_gin", "audio_features",
+            postgresql_using="gin",
+            postgresql_ops={"audio_features": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False, index=True)
     genre = Column(String, nullable=False)
@@ -27,10 +57,10 @@ class Song(Base):
     time_signature = Column(String, nullable=True)
     
     # Audio features for analysis
-    audio_features = Column(JSON, nullable=True)  # Store librosa analysis results
+    audio_features = Column(_JSON, nullable=True)  # Store librosa analysis results
     
     # Generation settings
-    generation_params = Column(JSON, nullable=True)
+    generation_params = Column(_JSON, nullable=True)
     
     # Status
     is_generated = Column(Boolean, default=False)
@@ -42,8 +72,12 @@ class Song(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    generated_at = Column(DateTime(timezone=True), nullable=True)  # set by the database when generation completes
     
-    # Relationships
-    creator = relationship("User", back_populates="songs")
-    recordings = relationship("Recording", back_populates="song")
-    predictions = relationship("PopularityPrediction", back_populates="song")
+    # Relationships are lazy="raise" here and on the related models: an
+    # unplanned per-row load fails loudly instead of issuing N+1 SELECTs (and
+    # would fail under AsyncSession anyway). Load them explicitly with
+    # selectinload/joinedload; rows are deleted with Core DELETE statements.
+    creator = relationship("User", back_populates="songs", lazy="raise")
+    recordings = relationship("Recording", back_populates="song", lazy="raise")
+    predictions = relationship("PopularityPrediction", back_populates="song", lazy="raise")
@@ -21,7 +21,7 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
-    # Relationships
-    songs = relationship("Song", back_populates="creator")
-    recordings = relationship("Recording", back_populates="user")
-    predictions = relationship("PopularityPrediction", back_populates="user")
+    # Relationships (never lazy-loaded, see Song)
+    songs = relationship("Song", back_populates="creator", lazy="raise")
+    recordings = relationship("Recording", back_populates="user", lazy="raise")
+    predictions = relationship("PopularityPrediction", back_populates="user", lazy="raise")
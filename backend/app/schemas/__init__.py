@@ -1,7 +1,13 @@
 from .user import User, UserCreate, UserUpdate, UserLogin, Token, TokenData
-from .song import Song, SongCreate, SongUpdate, SongGenerate, SongWithCreator, SongList
+from .song import (
+    Song, SongCreate, SongUpdate, SongGenerate, SongWithCreator, SongSummary, SongList,
+    LyricsGenerate, SongFromLyricsGenerate, InstrumentalGenerate, SongRemix,
+    SongBulkDelete, SongBulkVisibility
+)
 
 __all__ = [
     "User", "UserCreate", "UserUpdate", "UserLogin", "Token", "TokenData",
-    "Song", "SongCreate", "SongUpdate", "SongGenerate", "SongWithCreator", "SongList"
+    "Song", "SongCreate", "SongUpdate", "SongGenerate", "SongWithCreator", "SongSummary", "SongList",
+    "LyricsGenerate", "SongFromLyricsGenerate", "InstrumentalGenerate", "SongRemix",
+    "SongBulkDelete", "SongBulkVisibility"
 ]
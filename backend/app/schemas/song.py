@@ -1,8 +1,43 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 
+class AudioFeatures(BaseModel):
+    """Analysis stored with a generated song; unknown keys are kept"""
+    model_config = ConfigDict(extra="allow", frozen=True)
+
+    generation_quality: Optional[str] = None
+    estimated_appeal: Optional[float] = None
+    complexity_score: Optional[float] = None
+    genre_consistency: Optional[float] = None
+    lyrical_coherence: Optional[float] = None
+    musical_structure: Optional[str] = None
+    recommendations: Optional[List[str]] = None
+    lyrics_analysis: Optional[Dict[str, Any]] = None
+    musical_analysis: Optional[Dict[str, Any]] = None
+    audio_analysis: Optional[Dict[str, Any]] = None
+
+
+class GenerationParams(BaseModel):
+    """Generation status and outcome of a song; unknown keys are kept"""
+    model_config = ConfigDict(extra="allow", frozen=True)
+
+    params_hash: Optional[str] = None
+    task_id: Optional[str] = None
+    generation_status: Optional[str] = None
+    generation_step: Optional[str] = None
+    generation_successful: Optional[bool] = None
+    audio_engine: Optional[str] = None
+    audio_quality: Optional[str] = None
+    files_generated: Optional[Dict[str, bool]] = None
+    result_reused: Optional[bool] = None
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+    user_friendly_error: Optional[str] = None
+    suggestions: Optional[List[str]] = None
+
+
 class SongBase(BaseModel):
     title: str
     genre: str
@@ -12,8 +47,10 @@ class SongBase(BaseModel):
 
 
 class SongCreate(SongBase):
+    model_config = ConfigDict(frozen=True)
+
     lyrics: Optional[str] = None
-    generation_params: Optional[Dict[str, Any]] = None
+    generation_params: Optional[GenerationParams] = None
 
 
 class SongUpdate(BaseModel):
@@ -27,6 +64,8 @@ class SongUpdate(BaseModel):
 
 
 class SongGenerate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     title: str
     genre: str
     style: Optional[str] = None
@@ -35,6 +74,68 @@ class SongGenerate(BaseModel):
     custom_prompt: Optional[str] = None
     include_audio: bool = True
     include_midi: bool = True
+    # Reuse the result of an identical earlier request by the same user
+    # instead of generating again
+    reuse: bool = False
+
+
+class LyricsGenerate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    title: str = "Untitled"
+    genre: str = "Pop"
+    theme: Optional[str] = None
+    style: Optional[str] = None
+    custom_prompt: Optional[str] = None
+
+
+class SongFromLyricsGenerate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    title: str = Field(..., min_length=1)
+    lyrics: str = Field(..., min_length=1)
+    genre: str = "Pop"
+    style: Optional[str] = None
+    voice_type: str = "Male"
+    key: str = "C"
+    tempo: int = 120
+    duration: Optional[int] = None
+    include_audio: bool = True
+    include_midi: bool = True
+    reuse: bool = False
+
+
+class InstrumentalGenerate(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    title: str = "Untitled"
+    genre: str = "Pop"
+    key: str = "C"
+    tempo: int = 120
+    duration: int = 180
+    style: Optional[str] = None
+    include_audio: bool = True
+
+
+class SongRemix(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    new_genre: str = "Pop"
+    new_tempo: int = 120
+    new_key: str = "C"
+
+
+class SongBulkDelete(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    ids: list[int] = Field(..., min_length=1, max_length=100)
+
+
+class SongBulkVisibility(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    ids: list[int] = Field(..., min_length=1, max_length=100)
+    is_public: bool
 
 
 class SongInDBBase(SongBase):
@@ -47,16 +148,16 @@ class SongInDBBase(SongBase):
     tempo: Optional[float] = None
     key_signature: Optional[str] = None
     time_signature: Optional[str] = None
-    audio_features: Optional[Dict[str, Any]] = None
-    generation_params: Optional[Dict[str, Any]] = None
+    audio_features: Optional[AudioFeatures] = None
+    generation_params: Optional[GenerationParams] = None
     is_generated: bool = False
     is_public: bool = True
     creator_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    generated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class Song(SongInDBBase):
@@ -67,8 +168,29 @@ class SongWithCreator(Song):
     creator: Optional[Dict[str, Any]] = None
 
 
+# Built once; list endpoints validate and dump rows through it directly
+SONG_LIST_ADAPTER = TypeAdapter(list[Song])
+
+
+class SongSummary(BaseModel):
+    """List view of a song, without lyrics or the JSON blobs"""
+    id: int
+    title: str
+    genre: str
+    duration: Optional[float] = None
+    tempo: Optional[float] = None
+    key_signature: Optional[str] = None
+    creator_id: int
+    is_generated: bool = False
+    is_public: bool = True
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
 class SongList(BaseModel):
-    songs: list[Song]
-    total: int
-    page: int
+    songs: list[SongSummary]
+    # Only counted for the first page
+    total: Optional[int] = None
     per_page: int
+    next_cursor: Optional[str] = None
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional
 from datetime import datetime
 
@@ -12,6 +12,8 @@ class UserBase(BaseModel):
 
 
 class UserCreate(UserBase):
+    model_config = ConfigDict(frozen=True)
+
     password: str
 
 
@@ -29,8 +31,7 @@ class UserInDBBase(UserBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class User(UserInDBBase):
@@ -42,11 +43,15 @@ class UserInDB(UserInDBBase):
 
 
 class UserLogin(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     email: EmailStr
     password: str
 
 
 class Token(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     access_token: str
     token_type: str
 
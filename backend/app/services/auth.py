@@ -1,64 +1,135 @@
-from typing import Optional
-from sqlalchemy.orm import Session
+import asyncio
+import hashlib
+import time
+from datetime import timedelta
+from typing import Dict, NamedTuple, Optional
+from cachetools import TTLCache
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from ..core.security import verify_password, get_password_hash, create_access_token
+from ..core.config import settings
+from ..core.database import insert_or_ignore
+from ..core.security import verify_password_async, get_password_hash_async, create_access_token
 from ..models.user import User
 from ..schemas.user import UserCreate
 
+# Signed access tokens per user, reused on repeat logins while they remain
+# valid for at least _TOKEN_REUSE_BUFFER more seconds.
+_TOKEN_REUSE_BUFFER = 60
+_token_cache: TTLCache = TTLCache(
+    maxsize=10_000,
+    ttl=max(settings.access_token_expire_minutes * 60 - _TOKEN_REUSE_BUFFER, 1),
+)
+
+# Authentications in progress, keyed by a digest of the submitted
+# credentials, so concurrent identical logins share one bcrypt check.
+_inflight_logins: Dict[str, asyncio.Future] = {}
+
+
+class AuthenticatedUser(NamedTuple):
+    """Identity of a verified login; plain values, so it can be handed to
+    requests other than the one whose session loaded the user"""
+    id: int
+    email: str
+
+
+class _LoginAbandoned(Exception):
+    """The request running a shared credential check was cancelled"""
+
 
 class AuthService:
     @staticmethod
-    def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+    async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[AuthenticatedUser]:
         """Authenticate user with email and password"""
-        user = db.query(User).filter(User.email == email).first()
+        key = hashlib.sha256(f"{email}\0{password}".encode()).hexdigest()
+        while (pending := _inflight_logins.get(key)) is not None:
+            try:
+                return await asyncio.shield(pending)
+            except _LoginAbandoned:
+                # Its check never finished; run (or join) a fresh one
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        _inflight_logins[key] = future
+        try:
+            user = await AuthService._verify_credentials(db, email, password)
+        except BaseException as exc:
+            # Joined logins get errors from the check itself; the leader being
+            # cancelled just sends them back to check again
+            future.set_exception(exc if isinstance(exc, Exception) else _LoginAbandoned())
+            # Mark retrieved so a login nobody else joined doesn't log a warning
+            future.exception()
+            raise
+        else:
+            future.set_result(user)
+            return user
+        finally:
+            _inflight_logins.pop(key, None)
+
+    @staticmethod
+    async def _verify_credentials(db: AsyncSession, email: str, password: str) -> Optional[AuthenticatedUser]:
+        """Look up the user by email and check the password hash"""
+        user = await db.scalar(select(User).where(User.email == email))
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        # bcrypt takes ~100ms+ per check; keep it off the event loop and the GIL
+        if not await verify_password_async(password, user.hashed_password):
             return None
-        return user
+        return AuthenticatedUser(user.id, user.email)
 
     @staticmethod
-    def create_user(db: Session, user: UserCreate) -> User:
+    async def create_user(db: AsyncSession, user: UserCreate) -> User:
         """Create a new user"""
-        # Check if user already exists
-        if db.query(User).filter(User.email == user.email).first():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
+        hashed_password = await get_password_hash_async(user.password)
+
+        # Single round-trip: the insert is skipped if email or username is taken
+        db_user = await db.scalar(
+            insert_or_ignore(User)
+            .values(
+                email=user.email,
+                username=user.username,
+                full_name=user.full_name,
+                bio=user.bio,
+                hashed_password=hashed_password,
+                is_active=user.is_active,
             )
-        
-        if db.query(User).filter(User.username == user.username).first():
+            .on_conflict_do_nothing()
+            .returning(User)
+        )
+        if db_user is None:
+            # Only on conflict: find out which unique field collided
+            if await db.scalar(select(User.id).where(User.email == user.email)):
+                detail = "Email already registered"
+            else:
+                detail = "Username already taken"
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already taken"
+                detail=detail
             )
 
-        # Create new user
-        hashed_password = get_password_hash(user.password)
-        db_user = User(
-            email=user.email,
-            username=user.username,
-            full_name=user.full_name,
-            bio=user.bio,
-            hashed_password=hashed_password,
-            is_active=user.is_active,
-        )
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
         return db_user
 
     @staticmethod
-    def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
         """Get user by email"""
-        return db.query(User).filter(User.email == email).first()
+        return await db.scalar(select(User).where(User.email == email))
 
     @staticmethod
-    def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
+    async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
         """Get user by ID"""
-        return db.query(User).filter(User.id == user_id).first()
+        return await db.get(User, user_id)
 
     @staticmethod
-    def create_access_token_for_user(user: User) -> str:
-        """Create access token for user"""
-        return create_access_token(data={"sub": user.email})
+    async def create_access_token_for_user(user_id: int, email: str) -> str:
+        """Create access token for user, reusing a still-valid cached one"""
+        key = (user_id, email)
+        cached = _token_cache.get(key)
+        now = time.time()
+        if cached and cached[1] - now > _TOKEN_REUSE_BUFFER:
+            return cached[0]
+
+        expires_delta = timedelta(minutes=settings.access_token_expire_minutes)
+        token = create_access_token(data={"sub": email}, expires_delta=expires_delta)
+        _token_cache[key] = (token, now + expires_delta.total_seconds())
+        return token
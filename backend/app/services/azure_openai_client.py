@@ -4,13 +4,109 @@ Provides a centralized client for Azure OpenAI API interactions
 """
 
 import asyncio
-from typing import Dict, Any, Optional, List
-from openai import AsyncAzureOpenAI
+from collections import Counter
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Any, Optional, List
+import httpx
+import orjson
+from openai import APIConnectionError, APITimeoutError, AsyncAzureOpenAI, RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+from app.core.cache import LLM_CACHE_TTL, get_cached, llm_key, set_cached
 from app.core.config import settings
+from app.core.http import get_http_client
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Stored as strings in settings; the API expects numbers
+_MAX_TOKENS = int(settings.azure_openai_max_tokens)
+_TEMPERATURE = float(settings.azure_openai_temperature)
+
+_BATCH_TERMINAL_STATES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+# System messages are shared across calls; only the user message is built
+# per request. Nothing may mutate them.
+_LYRICS_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a professional songwriter and lyricist. Create engaging, creative, and well-structured song lyrics that match the requested genre and theme."
+}
+_ANALYSIS_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a music industry expert and lyrical analyst. Provide detailed, professional analysis of song lyrics."
+}
+_ENHANCE_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a professional songwriter and lyricist. Enhance existing lyrics while maintaining their essence and structure."
+}
+_CONCEPT_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a creative music producer and songwriter. Generate innovative and marketable song concepts."
+}
+
+
+def _lyrics_messages(
+    title: str,
+    genre: str,
+    theme: Optional[str] = None,
+    style: Optional[str] = None,
+    custom_prompt: Optional[str] = None
+) -> List[Dict[str, str]]:
+    """Chat messages for a lyrics request, shared by the realtime and batch paths"""
+    # Build the prompt
+    if custom_prompt:
+        prompt = f"""Create song lyrics based on this prompt: {custom_prompt}
+                
+Title: {title}
+Genre: {genre}
+Theme: {theme or 'General'}
+Style: {style or 'Standard'}
+
+Please create complete song lyrics with verses, chorus, and bridge. Make them creative and engaging."""
+    else:
+        prompt = f"""Create song lyrics for a {genre} song titled "{title}".
+
+Theme: {theme or 'General'}
+Style: {style or 'Standard'}
+
+Please create complete song lyrics with:
+- 2-3 verses
+- A catchy chorus (repeated)
+- A bridge section
+- Appropriate structure for the {genre} genre
+
+Make the lyrics creative, meaningful, and suitable for the theme "{theme or 'General'}"."""
+
+    return [_LYRICS_SYSTEM_MESSAGE, {"role": "user", "content": prompt}]
+
+
+def _analysis_messages(lyrics: str) -> List[Dict[str, str]]:
+    """Chat messages for a lyrics analysis request"""
+    prompt = f"""Analyze the following song lyrics and provide a detailed analysis:
+
+Lyrics:
+{lyrics}
+
+Respond with JSON in this format:
+{{
+    "overall_sentiment": "positive/negative/neutral",
+    "emotional_tone": "description of emotional tone",
+    "main_themes": ["theme1", "theme2", "theme3"],
+    "mood": "description of mood",
+    "target_audience": "description of likely audience",
+    "lyrical_quality": "assessment of lyrical quality",
+    "suggestions": ["suggestion1", "suggestion2"]
+}}"""
+    return [_ANALYSIS_SYSTEM_MESSAGE, {"role": "user", "content": prompt}]
+
+
+def _is_json(text: str) -> bool:
+    try:
+        orjson.loads(text)
+    except orjson.JSONDecodeError:
+        return False
+    return True
+
 
 class AzureOpenAIClient:
     """Azure OpenAI client for handling AI-powered features"""
@@ -29,7 +125,8 @@ class AzureOpenAIClient:
             self.client = AsyncAzureOpenAI(
                 api_key=settings.azure_openai_api_key,
                 azure_endpoint=settings.azure_openai_endpoint,
-                api_version=settings.azure_openai_api_version
+                api_version=settings.azure_openai_api_version,
+                http_client=get_http_client()
             )
             logger.info("Azure OpenAI client initialized successfully")
             
@@ -37,6 +134,104 @@ class AzureOpenAIClient:
             logger.error(f"Failed to initialize Azure OpenAI client: {e}")
             self.client = None
     
+    @retry(
+        retry=retry_if_exception_type((RateLimitError, APITimeoutError, APIConnectionError)),
+        wait=wait_random_exponential(min=1, max=30),
+        stop=stop_after_attempt(3),
+        reraise=True
+    )
+    async def _chat(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        json_mode: bool = False
+    ) -> str:
+        """Run one chat completion and return the reply text; rate limits,
+        timeouts and connection errors are retried with jittered backoff.
+        json_mode constrains the reply to a JSON object."""
+        options = {"response_format": {"type": "json_object"}} if json_mode else {}
+        response = await self.client.chat.completions.create(
+            model=settings.azure_openai_deployment,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            **options
+        )
+        return response.choices[0].message.content.strip()
+    
+    async def _cached_chat(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        bypass_cache: bool = False,
+        json_mode: bool = False
+    ) -> str:
+        """_chat through the Redis response cache. Identical requests reuse the
+        stored reply; bypass_cache asks for a fresh one, which replaces it.
+        Only for analyses: creative replies must differ between requests."""
+        # A given prompt is always sent in the same mode, so json_mode
+        # needn't be part of the key
+        key = llm_key(settings.azure_openai_deployment, messages, max_tokens, temperature)
+        if not bypass_cache:
+            cached = await get_cached(key)
+            if cached is not None:
+                return cached.decode()
+        reply = await self._chat(messages, max_tokens, temperature, json_mode)
+        if not json_mode or _is_json(reply):
+            await set_cached(key, reply.encode(), ttl=LLM_CACHE_TTL)
+        return reply
+    
+    async def _chat_json(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        cache: bool = False,
+        bypass_cache: bool = False
+    ) -> Dict[str, Any]:
+        """Chat completion in JSON mode, parsed, and with cache set, through
+        the response cache. A reply that still doesn't parse (e.g. cut off at
+        max_tokens) is retried once at temperature 0; a second failure raises."""
+        if cache:
+            text = await self._cached_chat(messages, max_tokens, temperature, bypass_cache, json_mode=True)
+        else:
+            text = await self._chat(messages, max_tokens, temperature, json_mode=True)
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            logger.warning("Azure OpenAI returned invalid JSON, retrying at temperature 0")
+        if cache:
+            text = await self._cached_chat(messages, max_tokens, 0.0, bypass_cache=True, json_mode=True)
+        else:
+            text = await self._chat(messages, max_tokens, 0.0, json_mode=True)
+        return orjson.loads(text)
+    
+    async def _chat_many(
+        self,
+        messages: List[Dict[str, str]],
+        n_samples: int,
+        max_tokens: int,
+        temperature: float,
+        concurrency: int = 10,
+        json_mode: bool = False
+    ) -> List[str]:
+        """Sample the same request n_samples times concurrently, at most
+        `concurrency` in flight. Failed samples are dropped; raises only if
+        all of them fail."""
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def sample() -> str:
+            async with semaphore:
+                return await self._chat(messages, max_tokens, temperature, json_mode)
+        
+        results = await asyncio.gather(*(sample() for _ in range(n_samples)), return_exceptions=True)
+        samples = [r for r in results if not isinstance(r, BaseException)]
+        if not samples:
+            raise results[0]
+        return samples
+    
     async def generate_lyrics(
         self,
         title: str,
@@ -51,54 +246,122 @@ class AzureOpenAIClient:
             raise Exception("Azure OpenAI client not initialized. Check your configuration.")
         
         try:
-            # Build the prompt
-            if custom_prompt:
-                prompt = f"""Create song lyrics based on this prompt: {custom_prompt}
-                
-Title: {title}
-Genre: {genre}
-Theme: {theme or 'General'}
-Style: {style or 'Standard'}
-
-Please create complete song lyrics with verses, chorus, and bridge. Make them creative and engaging."""
-            else:
-                prompt = f"""Create song lyrics for a {genre} song titled "{title}".
-
-Theme: {theme or 'General'}
-Style: {style or 'Standard'}
-
-Please create complete song lyrics with:
-- 2-3 verses
-- A catchy chorus (repeated)
-- A bridge section
-- Appropriate structure for the {genre} genre
-
-Make the lyrics creative, meaningful, and suitable for the theme "{theme or 'General'}"."""
-
-            response = await self.client.chat.completions.create(
-                model=settings.azure_openai_deployment,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional songwriter and lyricist. Create engaging, creative, and well-structured song lyrics that match the requested genre and theme."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=settings.azure_openai_max_tokens,
-                temperature=settings.azure_openai_temperature
+            return await self._chat(
+                _lyrics_messages(title, genre, theme, style, custom_prompt),
+                max_tokens=_MAX_TOKENS,
+                temperature=_TEMPERATURE
             )
             
-            lyrics = response.choices[0].message.content.strip()
-            return lyrics
-            
         except Exception as e:
             logger.error(f"Failed to generate lyrics with Azure OpenAI: {e}")
             raise Exception(f"Failed to generate lyrics: {str(e)}")
     
-    async def enhance_lyrics(self, existing_lyrics: str, enhancement_request: str) -> str:
+    async def generate_lyrics_stream(
+        self,
+        title: str,
+        genre: str,
+        theme: Optional[str] = None,
+        style: Optional[str] = None,
+        custom_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Yield generated lyrics as they arrive, so callers can show the first
+        lines right away. Streams aren't retried."""
+        
+        if not self.client:
+            raise Exception("Azure OpenAI client not initialized. Check your configuration.")
+        
+        stream = await self.client.chat.completions.create(
+            model=settings.azure_openai_deployment,
+            messages=_lyrics_messages(title, genre, theme, style, custom_prompt),
+            max_tokens=_MAX_TOKENS,
+            temperature=_TEMPERATURE,
+            stream=True
+        )
+        async for chunk in stream:
+            # Azure sends content filter results as chunks without choices
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    async def generate_lyrics_batch(
+        self,
+        specs: List[Dict[str, Any]],
+        poll_interval: float = 30.0,
+        max_poll_interval: float = 600.0
+    ) -> List[str]:
+        """Generate lyrics for many songs through the Batch API, for backfills
+        and other callers that can wait (up to 24h) in exchange for running
+        off the realtime quota. Each spec holds generate_lyrics' keyword
+        arguments; results keep their order, with "" for failed requests."""
+        
+        if not self.client:
+            raise Exception("Azure OpenAI client not initialized. Check your configuration.")
+        if not specs:
+            return []
+        
+        # The SDK version in use predates batch helpers, so the batch
+        # endpoints are called through the client's generic request methods
+        requests = b"\n".join(
+            orjson.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/chat/completions",
+                "body": {
+                    "model": settings.azure_openai_deployment,
+                    "messages": _lyrics_messages(**spec),
+                    "max_tokens": _MAX_TOKENS,
+                    "temperature": _TEMPERATURE
+                }
+            })
+            for i, spec in enumerate(specs)
+        )
+        try:
+            input_file = await self.client.files.create(
+                file=("lyrics_batch.jsonl", requests), purpose="batch"
+            )
+            batch = (await self.client.post(
+                "/batches",
+                body={
+                    "input_file_id": input_file.id,
+                    "endpoint": "/chat/completions",
+                    "completion_window": "24h"
+                },
+                cast_to=httpx.Response
+            )).json()
+            
+            delay = poll_interval
+            while batch["status"] not in _BATCH_TERMINAL_STATES:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, max_poll_interval)
+                batch = (await self.client.get(
+                    f"/batches/{batch['id']}", cast_to=httpx.Response
+                )).json()
+            
+            if batch["status"] != "completed" or not batch.get("output_file_id"):
+                raise Exception(f"Batch {batch['id']} ended as {batch['status']}")
+            output = await self.client.get(
+                f"/files/{batch['output_file_id']}/content", cast_to=httpx.Response
+            )
+        except Exception as e:
+            logger.error(f"Failed to generate lyrics batch with Azure OpenAI: {e}")
+            raise Exception(f"Failed to generate lyrics batch: {str(e)}")
+        
+        # Output lines arrive in completion order, keyed by custom_id
+        lyrics = [""] * len(specs)
+        for line in output.content.splitlines():
+            if not line.strip():
+                continue
+            result = orjson.loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") == 200:
+                content = response["body"]["choices"][0]["message"]["content"]
+                lyrics[int(result["custom_id"])] = content.strip()
+        return lyrics
+    
+    async def enhance_lyrics(
+        self,
+        existing_lyrics: str,
+        enhancement_request: str
+    ) -> str:
         """Enhance existing lyrics based on user request"""
         
         if not self.client:
@@ -114,94 +377,66 @@ Enhancement request: {enhancement_request}
 
 Please provide the enhanced version of the lyrics, maintaining the original structure but improving according to the request."""
 
-            response = await self.client.chat.completions.create(
-                model=settings.azure_openai_deployment,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional songwriter and lyricist. Enhance existing lyrics while maintaining their essence and structure."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=settings.azure_openai_max_tokens,
-                temperature=settings.azure_openai_temperature
+            return await self._chat(
+                [_ENHANCE_SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
+                max_tokens=_MAX_TOKENS,
+                temperature=_TEMPERATURE
             )
             
-            enhanced_lyrics = response.choices[0].message.content.strip()
-            return enhanced_lyrics
-            
         except Exception as e:
             logger.error(f"Failed to enhance lyrics with Azure OpenAI: {e}")
             raise Exception(f"Failed to enhance lyrics: {str(e)}")
     
-    async def analyze_lyrics_sentiment(self, lyrics: str) -> Dict[str, Any]:
+    async def analyze_lyrics_sentiment(self, lyrics: str, bypass_cache: bool = False) -> Dict[str, Any]:
         """Analyze the sentiment and themes of lyrics"""
         
         if not self.client:
             raise Exception("Azure OpenAI client not initialized. Check your configuration.")
         
         try:
-            prompt = f"""Analyze the following song lyrics and provide a detailed analysis:
-
-Lyrics:
-{lyrics}
-
-Please provide analysis in the following JSON format:
-{{
-    "overall_sentiment": "positive/negative/neutral",
-    "emotional_tone": "description of emotional tone",
-    "main_themes": ["theme1", "theme2", "theme3"],
-    "mood": "description of mood",
-    "target_audience": "description of likely audience",
-    "lyrical_quality": "assessment of lyrical quality",
-    "suggestions": ["suggestion1", "suggestion2"]
-}}"""
-
-            response = await self.client.chat.completions.create(
-                model=settings.azure_openai_deployment,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a music industry expert and lyrical analyst. Provide detailed, professional analysis of song lyrics."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+            return await self._chat_json(
+                _analysis_messages(lyrics),
                 max_tokens=1000,
-                temperature=0.3  # Lower temperature for more consistent analysis
+                temperature=0.3,  # Lower temperature for more consistent analysis
+                cache=True,
+                bypass_cache=bypass_cache
             )
             
-            analysis_text = response.choices[0].message.content.strip()
-            
-            # Try to parse as JSON, fallback to text analysis if needed
-            try:
-                import json
-                analysis = json.loads(analysis_text)
-            except:
-                # Fallback to structured text analysis
-                analysis = {
-                    "overall_sentiment": "neutral",
-                    "emotional_tone": "Unable to parse detailed analysis",
-                    "main_themes": ["general"],
-                    "mood": "Unknown",
-                    "target_audience": "General",
-                    "lyrical_quality": "Analysis available in raw format",
-                    "suggestions": ["Review raw analysis"],
-                    "raw_analysis": analysis_text
-                }
-            
-            return analysis
-            
         except Exception as e:
             logger.error(f"Failed to analyze lyrics with Azure OpenAI: {e}")
             raise Exception(f"Failed to analyze lyrics: {str(e)}")
     
-    async def generate_song_concept(self, genre: str, mood: str, keywords: List[str]) -> Dict[str, Any]:
+    async def analyze_lyrics_sentiment_voted(self, lyrics: str, n_samples: int = 5) -> Dict[str, Any]:
+        """Analyze lyrics several times concurrently and return an analysis
+        carrying the majority overall_sentiment, for steadier results than a
+        single sample at about the same latency"""
+        
+        if not self.client:
+            raise Exception("Azure OpenAI client not initialized. Check your configuration.")
+        
+        try:
+            samples = await self._chat_many(
+                _analysis_messages(lyrics), n_samples, max_tokens=1000, temperature=0.3, json_mode=True
+            )
+        except Exception as e:
+            logger.error(f"Failed to analyze lyrics with Azure OpenAI: {e}")
+            raise Exception(f"Failed to analyze lyrics: {str(e)}")
+        
+        # Samples that don't parse just lose their vote
+        analyses = [orjson.loads(text) for text in samples if _is_json(text)]
+        if not analyses:
+            raise Exception("Failed to analyze lyrics: no sample returned valid JSON")
+        votes = Counter(analysis.get("overall_sentiment") for analysis in analyses)
+        sentiment, count = votes.most_common(1)[0]
+        analysis = next(a for a in analyses if a.get("overall_sentiment") == sentiment)
+        return {**analysis, "sentiment_votes": dict(votes), "sentiment_agreement": count / len(analyses)}
+    
+    async def generate_song_concept(
+        self,
+        genre: str,
+        mood: str,
+        keywords: List[str]
+    ) -> Dict[str, Any]:
         """Generate a complete song concept including title, theme, and structure"""
         
         if not self.client:
@@ -214,7 +449,7 @@ Please provide analysis in the following JSON format:
 
 Keywords to incorporate: {keywords_str}
 
-Please provide a detailed song concept in the following JSON format:
+Respond with JSON in this format:
 {{
     "title": "Song Title",
     "theme": "Main theme of the song",
@@ -232,50 +467,12 @@ Please provide a detailed song concept in the following JSON format:
     "inspiration": "brief description of inspiration"
 }}"""
 
-            response = await self.client.chat.completions.create(
-                model=settings.azure_openai_deployment,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a creative music producer and songwriter. Generate innovative and marketable song concepts."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+            return await self._chat_json(
+                [_CONCEPT_SYSTEM_MESSAGE, {"role": "user", "content": prompt}],
                 max_tokens=1500,
                 temperature=0.8  # Higher temperature for more creativity
             )
             
-            concept_text = response.choices[0].message.content.strip()
-            
-            # Try to parse as JSON
-            try:
-                import json
-                concept = json.loads(concept_text)
-            except:
-                # Fallback concept
-                concept = {
-                    "title": f"Untitled {genre} Song",
-                    "theme": mood.capitalize(),
-                    "story": "A song about life experiences",
-                    "structure": {
-                        "verse_count": 2,
-                        "has_pre_chorus": False,
-                        "has_bridge": True,
-                        "has_outro": False
-                    },
-                    "key_elements": keywords,
-                    "target_emotion": mood,
-                    "lyrical_approach": f"{genre} style with {mood} mood",
-                    "suggested_tempo": "medium",
-                    "inspiration": "Generated concept",
-                    "raw_concept": concept_text
-                }
-            
-            return concept
-            
         except Exception as e:
             logger.error(f"Failed to generate song concept with Azure OpenAI: {e}")
             raise Exception(f"Failed to generate song concept: {str(e)}")
@@ -285,5 +482,8 @@ Please provide a detailed song concept in the following JSON format:
         return self.client is not None
 
 
-# Global instance
-azure_openai_client = AzureOpenAIClient()
+@lru_cache(maxsize=1)
+def get_azure_openai_client() -> AzureOpenAIClient:
+    """Process-wide client, built on first use so importing this module
+    doesn't set up the OpenAI SDK; every caller shares its connection pool"""
+    return AzureOpenAIClient()
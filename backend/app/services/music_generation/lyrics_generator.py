@@ -1,7 +1,7 @@
 import asyncio
 import random
 from typing import Dict, Any, Optional, List
-from app.services.azure_openai_client import azure_openai_client
+from app.services.azure_openai_client import get_azure_openai_client
 
 class LyricsGenerator:
     """Lyrics generation service for creating song lyrics"""
@@ -126,6 +126,7 @@ class LyricsGenerator:
     async def _generate_from_prompt(self, prompt: str, title: str, genre: str) -> str:
         """Generate lyrics from custom prompt"""
         # Try to use Azure OpenAI first, fallback to template-based generation
+        azure_openai_client = get_azure_openai_client()
         if azure_openai_client.is_available():
             try:
                 return await azure_openai_client.generate_lyrics(
@@ -151,6 +152,7 @@ class LyricsGenerator:
         """Generate lyrics from templates"""
         
         # Try to use Azure OpenAI first, fallback to template-based generation
+        azure_openai_client = get_azure_openai_client()
         if azure_openai_client.is_available():
             try:
                 return await azure_openai_client.generate_lyrics(
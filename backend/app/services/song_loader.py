@@ -0,0 +1,52 @@
+import asyncio
+from typing import Dict, Optional
+from sqlalchemy import select
+from ..core.database import AsyncSessionLocal
+from ..models.song import Song
+
+
+class SongLoader:
+    """Coalesces song lookups by id that arrive within a short window into a
+    single SELECT ... WHERE id IN (...)"""
+
+    def __init__(self, session_factory=AsyncSessionLocal, window: float = 0.002):
+        self._session_factory = session_factory
+        self._window = window
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def load(self, song_id: int) -> Optional[Song]:
+        """Get a song by id, or None if it doesn't exist"""
+        future = self._pending.get(song_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[song_id] = loop.create_future()
+            if self._flush_task is None:
+                self._flush_task = loop.create_task(self._flush())
+        # Shared between callers; one being cancelled must not cancel the rest
+        return await asyncio.shield(future)
+
+    async def _flush(self) -> None:
+        await asyncio.sleep(self._window)
+        batch, self._pending = self._pending, {}
+        self._flush_task = None
+
+        try:
+            async with self._session_factory() as session:
+                songs = await session.scalars(select(Song).where(Song.id.in_(batch)))
+                found = {song.id: song for song in songs}
+        except Exception as exc:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+                    # Mark retrieved so an abandoned lookup doesn't log a warning
+                    future.exception()
+            return
+
+        for song_id, future in batch.items():
+            if not future.done():
+                future.set_result(found.get(song_id))
+
+
+# Global instance
+song_loader = SongLoader()
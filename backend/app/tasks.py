@@ -0,0 +1,436 @@
+import asyncio
+import hashlib
+import logging
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import orjson
+from sqlalchemy import JSON, func, literal, literal_column, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+from .core.cache import invalidate_songs_sync
+from .core.celery_app import celery_app
+from .core.config import settings
+from .core.database import SessionLocal, engine
+from .models.generation_job import GenerationJob
+from .models.song import Song as SongModel
+from .api.deps import get_music_generator
+
+logger = logging.getLogger(__name__)
+
+_PUBLIC_BASE_URL = settings.public_base_url.rstrip("/")
+
+
+# Each worker process runs its coroutines on one long-lived loop rather than
+# asyncio.run per task, so the shared HTTP client's kept-alive connections
+# (bound to the loop that opened them) are reused across tasks
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _run(coro):
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+
+def _url(path: str) -> str:
+    """Public URL for a path relative to the server root"""
+    return f"{_PUBLIC_BASE_URL}/{path.lstrip('/')}"
+
+
+@celery_app.task(name="songs.generate")
+def generate_song_task(song_id: int, song_request: Dict[str, Any]) -> None:
+    """Generate a complete song for a queued song record"""
+    try:
+        _generate_song(song_id, song_request)
+    finally:
+        invalidate_songs_sync(song_id)
+
+
+@celery_app.task(name="songs.generate_from_lyrics")
+def generate_song_from_lyrics_task(song_id: int, request: Dict[str, Any]) -> None:
+    """Generate music for a queued song record from its lyrics"""
+    try:
+        _generate_song_from_lyrics(song_id, request)
+    finally:
+        invalidate_songs_sync(song_id)
+
+
+@celery_app.task(name="songs.generate_instrumental")
+def generate_instrumental_task(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate an instrumental track; the result is kept in the result backend"""
+    return _run(get_music_generator().generate_instrumental(**request))
+
+
+@celery_app.task(name="songs.remix")
+def remix_song_task(song_id: int, request: Dict[str, Any]) -> Dict[str, Any]:
+    """Remix an existing song; the result is kept in the result backend"""
+    with SessionLocal.session_factory() as db:
+        song = db.get(SongModel, song_id)
+        if song is None:
+            raise ValueError(f"Song {song_id} not found")
+        original_midi_data = {
+            "title": song.title,
+            "genre": song.genre,
+            "tempo": int(song.tempo or 120),
+            "key": song.key_signature or "C",
+            "duration": int(song.duration or 180)
+        }
+    
+    return _run(get_music_generator().remix_song(
+        original_midi_data=original_midi_data,
+        new_genre=request["new_genre"],
+        new_tempo=request.get("new_tempo"),
+        new_key=request.get("new_key")
+    ))
+
+
+def params_hash(params: Dict[str, Any]) -> str:
+    """Stable key for a generation request, independent of key order"""
+    return hashlib.blake2b(
+        orjson.dumps(params, option=orjson.OPT_SORT_KEYS), digest_size=16
+    ).hexdigest()
+
+
+# Generation runs for minutes, so no session is held open across it: the
+# worker looks the song up, generates, then writes the outcome in one short
+# transaction. Pollers see the job start through the task state.
+
+def _load_job(song_id: int) -> Optional[Tuple[Optional[str], Optional[Dict[str, Any]]]]:
+    """Params hash of a queued song and the stored result of an identical
+    earlier request, or None if the song has been deleted"""
+    with SessionLocal.session_factory() as db:
+        row = db.execute(
+            select(SongModel.generation_params).where(SongModel.id == song_id)
+        ).one_or_none()
+        if row is None:
+            logger.warning(f"Song {song_id} was deleted before generation started")
+            return None
+        job_hash = (row.generation_params or {}).get("params_hash")
+        return job_hash, db.scalar(
+            select(GenerationJob.result).where(GenerationJob.params_hash == job_hash)
+        )
+
+
+def _merged_params(params_update: Dict[str, Any]):
+    """generation_params with params_update merged in by the database, so only
+    the changed keys are sent rather than the whole document"""
+    if engine.dialect.name == "postgresql":
+        return func.coalesce(
+            SongModel.generation_params, literal_column("'{}'::jsonb")
+        ).op("||")(literal(params_update, JSONB))
+    # SQLite's JSON merge-patch; updates here never carry null values, which
+    # it would treat as deletions
+    return func.json_patch(
+        func.coalesce(SongModel.generation_params, literal_column("'{}'")),
+        literal(params_update, JSON)
+    )
+
+
+def _update_song(db: Session, song_id: int, values: Dict[str, Any], params_update: Dict[str, Any]) -> None:
+    updated_id = db.scalar(
+        update(SongModel)
+        .where(SongModel.id == song_id)
+        .values(**values, generation_params=_merged_params(params_update))
+        .returning(SongModel.id)
+    )
+    if updated_id is None:
+        logger.warning(f"Song {song_id} was deleted during generation")
+
+
+def _save_failure(song_id: int, params_update: Dict[str, Any]) -> None:
+    with SessionLocal.session_factory() as db, db.begin():
+        _update_song(db, song_id, {}, params_update)
+
+
+def _save_generated(
+    song_id: int,
+    job_hash: Optional[str],
+    song: Dict[str, Any],
+    status: Dict[str, Any]
+) -> None:
+    """Store a successful generation on the song, and on its job so identical
+    requests can reuse it"""
+    with SessionLocal.session_factory() as db, db.begin():
+        # Completion time comes from the database clock
+        _update_song(db, song_id, {**song, "generated_at": func.now()}, status)
+        if job_hash:
+            db.execute(
+                update(GenerationJob)
+                .where(GenerationJob.params_hash == job_hash, GenerationJob.result.is_(None))
+                .values(result={"song": song, "status": status})
+            )
+
+
+def _song_values(generation_result: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values shared by every successful generation"""
+    values = {"is_generated": True}
+    
+    # Store metadata
+    if generation_result.get("duration"):
+        values["duration"] = generation_result["duration"]
+    if generation_result.get("tempo"):
+        values["tempo"] = generation_result["tempo"]
+    if generation_result.get("key"):
+        values["key_signature"] = generation_result["key"]
+    
+    # Store audio features and analysis
+    if generation_result.get("analysis"):
+        values["audio_features"] = generation_result["analysis"]
+    
+    return values
+
+
+def _completed_params(generation_result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "generation_status": "completed",
+        "generation_step": "completed",
+        "generation_successful": True,
+        "files_generated": {
+            "audio": generation_result.get("audio_file_path") is not None,
+            "midi": generation_result.get("midi_file_path") is not None
+        }
+    }
+
+
+def _copy_asset(stored_path: str) -> str:
+    """Copy a generated file under a fresh name, returned in the same form
+    (public URL or relative path) as it was stored"""
+    url_prefix = f"{_PUBLIC_BASE_URL}/"
+    is_url = stored_path.startswith(url_prefix)
+    source = Path(stored_path.removeprefix(url_prefix))
+    target = source.with_name(f"{source.stem}_{uuid.uuid4().hex[:8]}{source.suffix}")
+    shutil.copyfile(source, target)
+    return _url(str(target)) if is_url else str(target)
+
+
+def _reuse_result(song_id: int, stored: Dict[str, Any]) -> bool:
+    """Complete a song from an identical request's result, skipping generation.
+    The song gets its own copies of the files, so deleting either song leaves
+    the other intact; returns False if the stored files are gone."""
+    song = dict(stored["song"])
+    copies = []
+    try:
+        for column in ("audio_file_path", "midi_file_path"):
+            if song.get(column):
+                song[column] = _copy_asset(song[column])
+                copies.append(song[column])
+    except OSError as e:
+        logger.warning(f"Cannot reuse stored result for song {song_id}: {str(e)}")
+        for copy in copies:
+            Path(copy.removeprefix(f"{_PUBLIC_BASE_URL}/")).unlink(missing_ok=True)
+        return False
+    _save_generated(song_id, None, song, {**stored["status"], "result_reused": True})
+    return True
+
+
+def _generate_song(song_id: int, song_request: Dict[str, Any]) -> None:
+    job = _load_job(song_id)
+    if job is None:
+        return
+    job_hash, stored = job
+    # Only on request: a fresh generation is the point of asking again
+    if stored is not None and song_request.get("reuse") and _reuse_result(song_id, stored):
+        return
+    
+    engine_params: Dict[str, Any] = {}
+    try:
+        music_generator = get_music_generator()
+        
+        # Check if MusicGen is available and record the audio engine
+        if hasattr(music_generator, 'using_musicgen') and music_generator.using_musicgen:
+            engine_params = {"audio_engine": "musicgen", "audio_quality": "high"}
+        else:
+            engine_params = {"audio_engine": "basic_synthesizer", "audio_quality": "basic"}
+            logger.warning("MusicGen not available, using basic synthesizer")
+        
+        # Generate complete song using MusicGenerator
+        generation_result = _run(music_generator.generate_complete_song(
+            title=song_request["title"],
+            genre=song_request["genre"],
+            theme=song_request.get("theme"),
+            style=song_request.get("style"),
+            voice_type=song_request.get("voice_type", "Male"),
+            include_audio=song_request.get("include_audio", True),
+            include_midi=song_request.get("include_midi", True),
+            custom_prompt=song_request.get("custom_prompt")
+        ))
+        
+    except Exception as e:
+        error_message = str(e)
+        logger.error(f"Error generating song: {error_message}")
+        
+        # Determine user-friendly error message
+        markers = _error_markers(error_message)
+        error_type = _classify_error(markers)
+        
+        # Update song with error status
+        _save_failure(song_id, {
+            **engine_params,
+            "generation_status": "failed",
+            "generation_step": "error",
+            "generation_successful": False,
+            "error": error_message,
+            "error_type": error_type,
+            "user_friendly_error": _get_user_friendly_error(markers),
+            "suggestions": _get_error_suggestions(error_type)
+        })
+        raise
+    
+    # Update song with generated content
+    song = _song_values(generation_result)
+    song["lyrics"] = generation_result.get("lyrics", "")
+    
+    # Store file paths and convert to URLs
+    if generation_result.get("audio_file_path"):
+        song["audio_file_path"] = _url(generation_result["audio_file_path"])
+    if generation_result.get("midi_file_path"):
+        song["midi_file_path"] = _url(generation_result["midi_file_path"])
+    
+    _save_generated(song_id, job_hash, song, {**engine_params, **_completed_params(generation_result)})
+
+
+def _generate_song_from_lyrics(song_id: int, request: Dict[str, Any]) -> None:
+    job = _load_job(song_id)
+    if job is None:
+        return
+    job_hash, stored = job
+    if stored is not None and request.get("reuse") and _reuse_result(song_id, stored):
+        return
+    
+    try:
+        music_generator = get_music_generator()
+        
+        # Generate complete song using MusicGenerator
+        generation_result = _run(music_generator.generate_song_from_lyrics(
+            lyrics=request.get("lyrics"),
+            title=request.get("title"),
+            genre=request.get("genre", "Pop"),
+            voice_type=request.get("voice_type", "Male"),
+            key=request.get("key", "C"),
+            tempo=request.get("tempo", 120),
+            duration=request.get("duration"),
+            include_audio=request.get("include_audio", True),
+            include_midi=request.get("include_midi", True),
+            style=request.get("style")
+        ))
+        
+    except Exception as e:
+        logger.error(f"Error generating song from lyrics: {str(e)}")
+        # Update song with error status
+        _save_failure(song_id, {
+            "generation_status": "failed",
+            "generation_step": "error",
+            "generation_successful": False,
+            "error": str(e)
+        })
+        raise
+    
+    # Update song with generated content
+    song = _song_values(generation_result)
+    
+    # Store file paths
+    if generation_result.get("audio_file_path"):
+        song["audio_file_path"] = generation_result["audio_file_path"]
+    if generation_result.get("midi_file_path"):
+        song["midi_file_path"] = generation_result["midi_file_path"]
+    
+    _save_generated(song_id, job_hash, song, _completed_params(generation_result))
+
+
+# Every error keyword of interest in one alternation, so an error message
+# is scanned once; each named group marks which keyword family was seen.
+_ERROR_PATTERN = re.compile(
+    r"(?P<musicgen>musicgen)"
+    r"|(?P<audiocraft>audiocraft)"
+    r"|(?P<unavailable>not available)"
+    r"|(?P<gpu>cuda|gpu)"
+    r"|(?P<memory>memory)"
+    r"|(?P<timeout>timeout)"
+    r"|(?P<ai>azure|openai)"
+    r"|(?P<network>connection|network)"
+    r"|(?P<permission>permission|access)",
+    re.IGNORECASE
+)
+
+
+def _error_markers(error_message: str) -> frozenset:
+    """Names of the keyword families found in an error message"""
+    return frozenset(m.lastgroup for m in _ERROR_PATTERN.finditer(error_message))
+
+
+def _get_user_friendly_error(markers: frozenset) -> str:
+    """Convert technical error to user-friendly message"""
+    if "musicgen" in markers and "unavailable" in markers:
+        return "High-quality audio generation is currently unavailable. Using basic audio synthesis instead."
+    elif "gpu" in markers or "memory" in markers:
+        return "Audio generation failed due to insufficient system resources. Please try again with shorter duration or contact support."
+    elif "timeout" in markers:
+        return "Audio generation is taking longer than expected. Please try again or reduce the song duration."
+    elif "ai" in markers:
+        return "Lyrics generation service is temporarily unavailable. Please try again later."
+    elif "network" in markers:
+        return "Network connection issue. Please check your internet connection and try again."
+    elif "permission" in markers:
+        return "Access denied. Please check your account permissions."
+    else:
+        return "An unexpected error occurred during song generation. Please try again or contact support if the problem persists."
+
+
+def _classify_error(markers: frozenset) -> str:
+    """Classify error type for better handling"""
+    if "musicgen" in markers or "audiocraft" in markers:
+        return "audio_generation_error"
+    elif "gpu" in markers:
+        return "resource_error"
+    elif "ai" in markers:
+        return "ai_service_error"
+    elif "network" in markers:
+        return "network_error"
+    elif "timeout" in markers:
+        return "timeout_error"
+    else:
+        return "unknown_error"
+
+
+# Suggestions shown to the user for each error type
+_ERROR_SUGGESTIONS = {
+    "audio_generation_error": [
+        "Try using basic audio synthesis instead",
+        "Check if MusicGen dependencies are installed",
+        "Reduce song duration to under 30 seconds"
+    ],
+    "resource_error": [
+        "Try generating shorter songs (under 15 seconds)",
+        "Close other applications to free up memory",
+        "Contact support for system requirements"
+    ],
+    "ai_service_error": [
+        "Check your internet connection",
+        "Verify API credentials are configured",
+        "Try again in a few minutes"
+    ],
+    "network_error": [
+        "Check your internet connection",
+        "Try again in a few moments",
+        "Contact support if problem persists"
+    ],
+    "timeout_error": [
+        "Try generating shorter songs",
+        "Reduce complexity by using simpler genres",
+        "Try again during off-peak hours"
+    ],
+    "unknown_error": [
+        "Try again in a few minutes",
+        "Check your input parameters",
+        "Contact support with error details"
+    ]
+}
+
+
+def _get_error_suggestions(error_type: str) -> list:
+    """Get suggestions based on error type"""
+    return _ERROR_SUGGESTIONS.get(error_type, ["Try again later", "Contact support if problem persists"])
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Export the API's OpenAPI schema to a JSON file at build time.
+
+Point OPENAPI_SCHEMA_PATH at the output so each worker loads the schema
+from disk instead of generating it on the first /openapi.json request.
+"""
+
+import sys
+from pathlib import Path
+
+import orjson
+
+# Add the app directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+def main():
+    """Write app.openapi() to the given path (default: openapi.json)"""
+    from app.main import app
+
+    output = Path(sys.argv[1] if len(sys.argv) > 1 else "openapi.json")
+    output.write_bytes(orjson.dumps(app.openapi()))
+    print(f"✅ OpenAPI schema written to {output}")
+
+
+if __name__ == "__main__":
+    main()
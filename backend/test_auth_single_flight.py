@@ -0,0 +1,136 @@
+"""
+Tests for AuthService.authenticate_user sharing one credential check
+between concurrent identical logins.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the app directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services import auth
+from app.services.auth import AuthService, AuthenticatedUser
+
+USER = AuthenticatedUser(1, "test@example.com")
+
+
+class FakeCheck:
+    """Stand-in for _verify_credentials that stays in flight until released"""
+
+    def __init__(self, result=USER, error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self, db, email, password):
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+@pytest.fixture
+def check(monkeypatch):
+    def install(**kwargs):
+        fake = FakeCheck(**kwargs)
+        monkeypatch.setattr(AuthService, "_verify_credentials", staticmethod(fake))
+        return fake
+    yield install
+    auth._inflight_logins.clear()
+
+
+def login(password="secret"):
+    return asyncio.create_task(
+        AuthService.authenticate_user(None, USER.email, password)
+    )
+
+
+async def start(fake, count):
+    """A leader plus count - 1 logins that join its check"""
+    tasks = [login() for _ in range(count)]
+    await fake.started.wait()
+    await asyncio.sleep(0)
+    return tasks
+
+
+def test_concurrent_logins_share_one_check(check):
+    fake = check()
+
+    async def scenario():
+        tasks = await start(fake, 5)
+        fake.release.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(scenario()) == [USER] * 5
+    assert fake.calls == 1
+    assert auth._inflight_logins == {}
+
+
+def test_different_credentials_are_checked_separately(check):
+    fake = check()
+
+    async def scenario():
+        first = login("one")
+        await fake.started.wait()
+        second = login("two")
+        await asyncio.sleep(0)
+        fake.release.set()
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(scenario()) == [USER, USER]
+    assert fake.calls == 2
+
+
+def test_cancelled_leader_does_not_cancel_joined_logins(check):
+    fake = check()
+
+    async def scenario():
+        leader, *waiters = await start(fake, 4)
+        leader.cancel()
+        # Let the waiters wake up and regroup behind a new check first
+        for _ in range(5):
+            await asyncio.sleep(0)
+        fake.release.set()
+        results = await asyncio.gather(*waiters)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return results
+
+    assert asyncio.run(scenario()) == [USER] * 3
+    # The leader's check plus one rerun that the other waiters join
+    assert fake.calls == 2
+    assert auth._inflight_logins == {}
+
+
+def test_bad_password_is_shared_with_all_waiters(check):
+    fake = check(result=None)
+
+    async def scenario():
+        tasks = await start(fake, 3)
+        fake.release.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(scenario()) == [None] * 3
+    assert fake.calls == 1
+
+
+def test_check_error_is_raised_in_all_waiters(check):
+    fake = check(error=RuntimeError("database unavailable"))
+
+    async def scenario():
+        tasks = await start(fake, 3)
+        fake.release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert fake.calls == 1
+    assert auth._inflight_logins == {}
@@ -67,7 +67,7 @@ def test_azure_openai_config():
     
     try:
         from app.core.config import settings
-        from app.services.azure_openai_client import azure_openai_client
+        from app.services.azure_openai_client import get_azure_openai_client
         
         if settings.azure_openai_api_key and settings.azure_openai_endpoint:
             print("✅ Azure OpenAI credentials are configured")
@@ -78,7 +78,7 @@ def test_azure_openai_config():
             print(f"   Deployment: {settings.azure_openai_deployment}")
             print(f"   API Version: {settings.azure_openai_api_version}")
             
-            if azure_openai_client.is_available():
+            if get_azure_openai_client().is_available():
                 print("✅ Azure OpenAI client is initialized and ready")
             else:
                 print("⚠️  Azure OpenAI client failed to initialize")
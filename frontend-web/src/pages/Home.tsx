@@ -3,7 +3,7 @@ import { useSelector } from 'react-redux';
 import { useNavigate } from 'react-router-dom';
 import { RootState } from '../store';
 import { songsAPI } from '../services/api';
-import { GENRES, VOICE_TYPES, STYLES, SongGenerate } from '../types';
+import { GENRES, VOICE_TYPES, STYLES, SongGenerate, InstrumentalResult, RemixResult } from '../types';
 import './Home.css';
 
 interface GenerationResult {
@@ -99,10 +99,11 @@ const Home: React.FC = () => {
     setError(null);
 
     try {
-      const result = await songsAPI.generateSong(fullSongForm);
-      setResult({ type: 'full', data: result });
+      const accepted = await songsAPI.generateSong(fullSongForm);
+      const song = await songsAPI.waitForSong(accepted.song_id);
+      setResult({ type: 'full', data: song });
     } catch (error: any) {
-      setError(error.response?.data?.detail || 'Failed to generate song');
+      setError(error.response?.data?.detail || error.message || 'Failed to generate song');
     } finally {
       setIsLoading(false);
     }
@@ -137,10 +138,11 @@ const Home: React.FC = () => {
     setError(null);
 
     try {
-      const result = await songsAPI.generateInstrumental(instrumentalForm);
+      const accepted = await songsAPI.generateInstrumental(instrumentalForm);
+      const result = await songsAPI.waitForTask<InstrumentalResult>(accepted.task_id);
       setResult({ type: 'instrumental', data: result });
     } catch (error: any) {
-      setError(error.response?.data?.detail || 'Failed to generate instrumental');
+      setError(error.response?.data?.detail || error.message || 'Failed to generate instrumental');
     } finally {
       setIsLoading(false);
     }
@@ -156,14 +158,15 @@ const Home: React.FC = () => {
     setError(null);
 
     try {
-      const result = await songsAPI.remixSong(parseInt(remixForm.song_id), {
+      const accepted = await songsAPI.remixSong(parseInt(remixForm.song_id), {
         new_genre: remixForm.new_genre,
         new_tempo: remixForm.new_tempo,
         new_key: remixForm.new_key,
       });
+      const result = await songsAPI.waitForTask<RemixResult>(accepted.task_id);
       setResult({ type: 'remix', data: result });
     } catch (error: any) {
-      setError(error.response?.data?.detail || 'Failed to remix song');
+      setError(error.response?.data?.detail || error.message || 'Failed to remix song');
     } finally {
       setIsLoading(false);
     }
@@ -204,11 +207,12 @@ const Home: React.FC = () => {
         style: lyricsForm.style,
       };
 
-      const result = await songsAPI.generateSongFromLyrics(songData);
-      setResult({ type: 'full', data: result });
+      const accepted = await songsAPI.generateSongFromLyrics(songData);
+      const song = await songsAPI.waitForSong(accepted.song_id);
+      setResult({ type: 'full', data: song });
       setShowMusicForm(false);
     } catch (error: any) {
-      setError(error.response?.data?.detail || 'Failed to generate song from lyrics');
+      setError(error.response?.data?.detail || error.message || 'Failed to generate song from lyrics');
     } finally {
       setIsLoading(false);
     }
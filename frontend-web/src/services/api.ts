@@ -5,6 +5,12 @@ import {
   SongCreate,
   SongGenerate,
   SongList,
+  GenerationAccepted,
+  GenerationStatus,
+  TaskAccepted,
+  TaskStatus,
+  InstrumentalResult,
+  RemixResult,
   AuthTokens,
   LoginCredentials,
   RegisterData,
@@ -13,6 +19,11 @@ import {
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api/v1';
 
+// Interval between polls of a queued generation
+const POLL_INTERVAL_MS = 2000;
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
 // Create axios instance
 const api = axios.create({
   baseURL: API_BASE_URL,
@@ -97,7 +108,7 @@ export const usersAPI = {
 // Songs API
 export const songsAPI = {
   getSongs: async (params?: {
-    skip?: number;
+    cursor?: string;
     limit?: number;
     genre?: string;
     creator_id?: number;
@@ -106,9 +117,9 @@ export const songsAPI = {
     return response.data;
   },
 
-  getMySongs: async (skip = 0, limit = 20): Promise<Song[]> => {
+  getMySongs: async (cursor?: string, limit = 20): Promise<Song[]> => {
     const response: AxiosResponse<Song[]> = await api.get('/songs/my-songs', {
-      params: { skip, limit }
+      params: { cursor, limit }
     });
     return response.data;
   },
@@ -123,11 +134,30 @@ export const songsAPI = {
     return response.data;
   },
 
-  generateSong: async (songData: SongGenerate): Promise<Song> => {
-    const response: AxiosResponse<Song> = await api.post('/songs/generate', songData);
+  generateSong: async (songData: SongGenerate): Promise<GenerationAccepted> => {
+    const response: AxiosResponse<GenerationAccepted> = await api.post('/songs/generate', songData);
     return response.data;
   },
 
+  getGenerationStatus: async (songId: number): Promise<GenerationStatus> => {
+    const response: AxiosResponse<GenerationStatus> = await api.get(`/songs/${songId}/status`);
+    return response.data;
+  },
+
+  // Poll a queued generation until it finishes, then fetch the stored song
+  waitForSong: async (songId: number): Promise<Song> => {
+    for (;;) {
+      const status: GenerationStatus = await songsAPI.getGenerationStatus(songId);
+      if (status.has_error || status.task_state === 'FAILURE') {
+        throw new Error(status.error || 'Song generation failed');
+      }
+      if (status.is_completed) {
+        return songsAPI.getSong(songId);
+      }
+      await sleep(POLL_INTERVAL_MS);
+    }
+  },
+
   updateSong: async (songId: number, songData: Partial<Song>): Promise<Song> => {
     const response: AxiosResponse<Song> = await api.put(`/songs/${songId}`, songData);
     return response.data;
@@ -164,8 +194,8 @@ export const songsAPI = {
     include_audio?: boolean;
     include_midi?: boolean;
     style?: string;
-  }): Promise<Song> => {
-    const response: AxiosResponse<Song> = await api.post('/songs/generate-from-lyrics', data);
+  }): Promise<GenerationAccepted> => {
+    const response: AxiosResponse<GenerationAccepted> = await api.post('/songs/generate-from-lyrics', data);
     return response.data;
   },
 
@@ -177,17 +207,8 @@ export const songsAPI = {
     duration?: number;
     style?: string;
     include_audio?: boolean;
-  }): Promise<{
-    title: string;
-    genre: string;
-    key: string;
-    tempo: number;
-    duration: number;
-    midi_file_path: string;
-    audio_file_path?: string;
-    chord_progression: any;
-  }> => {
-    const response = await api.post('/songs/generate-instrumental', data);
+  }): Promise<TaskAccepted> => {
+    const response: AxiosResponse<TaskAccepted> = await api.post('/songs/generate-instrumental', data);
     return response.data;
   },
 
@@ -195,18 +216,30 @@ export const songsAPI = {
     new_genre: string;
     new_tempo?: number;
     new_key?: string;
-  }): Promise<{
-    title: string;
-    original_genre: string;
-    new_genre: string;
-    midi_file_path: string;
-    audio_file_path: string;
-    remix_info: any;
-  }> => {
-    const response = await api.post(`/songs/${songId}/remix`, data);
+  }): Promise<TaskAccepted> => {
+    const response: AxiosResponse<TaskAccepted> = await api.post(`/songs/${songId}/remix`, data);
     return response.data;
   },
 
+  getTaskStatus: async <T>(taskId: string): Promise<TaskStatus<T>> => {
+    const response: AxiosResponse<TaskStatus<T>> = await api.get(`/songs/tasks/${taskId}`);
+    return response.data;
+  },
+
+  // Poll a queued instrumental or remix until it finishes and return its result
+  waitForTask: async <T>(taskId: string): Promise<T> => {
+    for (;;) {
+      const status: TaskStatus<T> = await songsAPI.getTaskStatus<T>(taskId);
+      if (status.state === 'SUCCESS') {
+        return status.result as T;
+      }
+      if (status.state === 'FAILURE') {
+        throw new Error(status.error || 'Generation failed');
+      }
+      await sleep(POLL_INTERVAL_MS);
+    }
+  },
+
   getGenerationSuggestions: async (genre: string, theme?: string): Promise<{
     genre: string;
     recommended_tempos: number[];
@@ -1,18 +1,18 @@
 import { createSlice, createAsyncThunk, PayloadAction } from '@reduxjs/toolkit';
-import { Song, SongGenerate } from '../../types';
+import { Song, SongGenerate, SongSummary } from '../../types';
 import { songsAPI } from '../../services/api';
 
 interface SongsState {
-  songs: Song[];
+  songs: SongSummary[];
   mySongs: Song[];
   currentSong: Song | null;
   isLoading: boolean;
   isGenerating: boolean;
   error: string | null;
   pagination: {
-    total: number;
-    page: number;
+    total: number | null;
     per_page: number;
+    next_cursor: string | null;
   };
 }
 
@@ -25,8 +25,8 @@ const initialState: SongsState = {
   error: null,
   pagination: {
     total: 0,
-    page: 1,
     per_page: 20,
+    next_cursor: null,
   },
 };
 
@@ -34,7 +34,7 @@ const initialState: SongsState = {
 export const fetchSongs = createAsyncThunk(
   'songs/fetchSongs',
   async (params: {
-    skip?: number;
+    cursor?: string;
     limit?: number;
     genre?: string;
     creator_id?: number;
@@ -50,9 +50,9 @@ export const fetchSongs = createAsyncThunk(
 
 export const fetchMySongs = createAsyncThunk(
   'songs/fetchMySongs',
-  async (params: { skip?: number; limit?: number } | undefined, { rejectWithValue }) => {
+  async (params: { cursor?: string; limit?: number } | undefined, { rejectWithValue }) => {
     try {
-      const songs = await songsAPI.getMySongs(params?.skip, params?.limit);
+      const songs = await songsAPI.getMySongs(params?.cursor, params?.limit);
       return songs;
     } catch (error: any) {
       return rejectWithValue(error.response?.data?.detail || 'Failed to fetch my songs');
@@ -76,10 +76,11 @@ export const generateSong = createAsyncThunk(
   'songs/generateSong',
   async (songData: SongGenerate, { rejectWithValue }) => {
     try {
-      const song = await songsAPI.generateSong(songData);
-      return song;
+      // The song is only added once the worker has finished it
+      const accepted = await songsAPI.generateSong(songData);
+      return await songsAPI.waitForSong(accepted.song_id);
     } catch (error: any) {
-      return rejectWithValue(error.response?.data?.detail || 'Failed to generate song');
+      return rejectWithValue(error.response?.data?.detail || error.message || 'Failed to generate song');
     }
   }
 );
@@ -156,9 +157,9 @@ const songsSlice = createSlice({
         state.isLoading = false;
         state.songs = action.payload.songs;
         state.pagination = {
-          total: action.payload.total,
-          page: action.payload.page,
+          total: action.payload.total ?? state.pagination.total,
           per_page: action.payload.per_page,
+          next_cursor: action.payload.next_cursor,
         };
       })
       .addCase(fetchSongs.rejected, (state, action) => {
@@ -53,6 +53,7 @@ export interface SongGenerate {
   custom_prompt?: string;
   include_audio: boolean;
   include_midi: boolean;
+  reuse?: boolean;
 }
 
 export interface Recording {
@@ -122,11 +123,77 @@ export interface ApiError {
   detail: string;
 }
 
+// List view of a song, as returned by GET /songs
+export type SongSummary = Pick<
+  Song,
+  'id' | 'title' | 'genre' | 'duration' | 'tempo' | 'key_signature' |
+  'creator_id' | 'is_generated' | 'is_public' | 'created_at'
+>;
+
 export interface SongList {
-  songs: Song[];
-  total: number;
-  page: number;
+  songs: SongSummary[];
+  total: number | null;
   per_page: number;
+  next_cursor: string | null;
+}
+
+// 202 body of POST /songs/generate and /songs/generate-from-lyrics; the song
+// is filled in by a worker and polled via its status endpoint
+export interface GenerationAccepted {
+  song_id: number;
+  task_id: string;
+  status: string;
+  status_url: string;
+}
+
+export interface GenerationStatus {
+  song_id: number;
+  status: string;
+  step: string;
+  progress: number;
+  audio_engine: string;
+  audio_quality: string;
+  error: string | null;
+  suggestions: string[];
+  files_generated: Record<string, boolean>;
+  is_completed: boolean;
+  has_error: boolean;
+  task_state: string | null;
+}
+
+// 202 body of POST /songs/generate-instrumental and /songs/{id}/remix; the
+// result is read back from /songs/tasks/{task_id}
+export interface TaskAccepted {
+  task_id: string;
+  status: string;
+  status_url: string;
+}
+
+export interface TaskStatus<T> {
+  task_id: string;
+  state: string;
+  result?: T;
+  error?: string;
+}
+
+export interface InstrumentalResult {
+  title: string;
+  genre: string;
+  key: string;
+  tempo: number;
+  duration: number;
+  midi_file_path: string;
+  audio_file_path?: string;
+  chord_progression: any;
+}
+
+export interface RemixResult {
+  title: string;
+  original_genre: string;
+  new_genre: string;
+  midi_file_path: string;
+  audio_file_path: string;
+  remix_info: any;
 }
 
 // Audio-related types